@@ -0,0 +1,151 @@
+import random
+from itertools import islice
+from uuid import uuid4
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Max
+from market.models import MarketModel
+from order.models import OrderItemModel, OrderModel
+from product import search
+from product.models import ProductModel
+from rate.aggregates import rebuild_rating_aggregates
+from rate.models import RateModel
+from sync import changes
+from user.models import User, UserAddress
+
+PASSWORD = 'benchmark-password'
+CATEGORIES = ['Elektronika', 'Kiyim', 'Oziq-ovqat', 'Kitoblar', 'Sport', 'Uy-ro\'zg\'or', 'Go\'zallik', 'O\'yinchoqlar']
+WORDS = [
+    'telefon', 'noutbuk', 'ko\'ylak', 'non', 'choy', 'kitob', 'to\'p', 'lampa', 'stol', 'stul',
+    'krossovka', 'sumka', 'soat', 'quloqchin', 'olma', 'shampun', 'idish', 'gilam', 'velosiped', 'kamera',
+]
+# Tashkent and its surroundings
+LATITUDE = (41.15, 41.45)
+LONGITUDE = (69.05, 69.45)
+
+
+def _batches(objects, size):
+    iterator = iter(objects)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _insert(model, objects, batch_size):
+    ids = []
+    for batch in _batches(objects, batch_size):
+        with transaction.atomic():
+            ids += [obj.pk for obj in model.objects.bulk_create(batch)]
+    return ids
+
+
+def _last_id(model):
+    return model.objects.aggregate(last=Max('id'))['last'] or 0
+
+
+def _point(rng):
+    return rng.uniform(*LATITUDE), rng.uniform(*LONGITUDE)
+
+
+def seed(users, markets, products, rates, orders, items_per_order, batch_size=5000, seed=None, log=None):
+    """
+    Bulk insert a synthetic dataset on top of whatever is already stored and
+    return the number of rows created per model. Every user gets one
+    address and the password ``PASSWORD``.
+    """
+    rng = random.Random(seed)
+    run = uuid4().hex[:8]
+    log = log or (lambda message: None)
+    created = {}
+
+    password = make_password(PASSWORD)
+    user_ids = _insert(User, (
+        User(username=f'bench_{run}_{i}', password=password, is_verify=True) for i in range(users)
+    ), batch_size)
+    address_ids = _insert(UserAddress, (
+        UserAddress(
+            user_id=user_id, street=f'{rng.randint(1, 200)}-uy', main=True,
+            location={'lat': latitude, 'lng': longitude}, latitude=latitude, longitude=longitude,
+        )
+        for user_id, (latitude, longitude) in ((user_id, _point(rng)) for user_id in user_ids)
+    ), batch_size)
+    created['users'] = len(user_ids)
+    log(f"{len(user_ids)} users with addresses")
+
+    market_ids = _insert(MarketModel, (
+        MarketModel(
+            name=f'{rng.choice(WORDS).title()} market {i}', description=' '.join(rng.choices(WORDS, k=8)),
+            location=f'{latitude:.6f}, {longitude:.6f}', latitude=latitude, longitude=longitude,
+        )
+        for i, (latitude, longitude) in ((i, _point(rng)) for i in range(markets))
+    ), batch_size)
+    created['markets'] = len(market_ids)
+    log(f"{len(market_ids)} markets")
+
+    product_markets = []
+    last_id = _last_id(ProductModel)
+    for batch in _batches(range(products), batch_size):
+        objects = []
+        for i in batch:
+            category = rng.choice(CATEGORIES)
+            objects.append(ProductModel(
+                market_id=rng.choice(market_ids), sku=f'{run}-{i}',
+                name=' '.join(rng.choices(WORDS, k=2)).capitalize() + f' {i}',
+                description=' '.join(rng.choices(WORDS, k=12)),
+                category=category, category_normalized=category.lower(),
+                price=rng.randint(1, 500) * 1000, discount=rng.choice((0, 0, 0, 5, 10, 20)),
+                available=rng.random() < 0.8,
+            ))
+        with transaction.atomic(), search.deferred_sync(ProductModel.objects.filter(id__gt=last_id)):
+            product_markets += [(obj.pk, obj.market_id) for obj in ProductModel.objects.bulk_create(objects)]
+        last_id = product_markets[-1][0]
+    created['products'] = len(product_markets)
+    log(f"{len(product_markets)} products")
+
+    first_rate = _last_id(RateModel)
+    rate_count = 0
+    for batch in _batches(range(rates), batch_size):
+        objects = []
+        for _ in batch:
+            product_id, market_id = rng.choice(product_markets)
+            on_product = rng.random() < 0.8
+            objects.append(RateModel(
+                product_id=product_id if on_product else None, market_id=None if on_product else market_id,
+                user_id=rng.choice(user_ids), message=' '.join(rng.choices(WORDS, k=5)),
+                rate=float(rng.randint(1, 5)), anonym=rng.random() < 0.1,
+            ))
+        with transaction.atomic():
+            RateModel.objects.bulk_create(objects)
+        rate_count += len(objects)
+    with transaction.atomic():
+        changes.record_queryset(RateModel.objects.filter(id__gt=first_rate))
+        rebuild_rating_aggregates()
+    created['rates'] = rate_count
+    log(f"{rate_count} rates, rating aggregates rebuilt")
+
+    order_count = item_count = 0
+    for batch in _batches(range(orders), batch_size):
+        objects, basket = [], []
+        for _ in batch:
+            customer = rng.randrange(len(user_ids))
+            items = rng.choices(product_markets, k=max(items_per_order, 1))
+            objects.append(OrderModel(
+                product_id=items[0][0], market_id=items[0][1],
+                user_id=user_ids[customer], user_address_id=address_ids[customer],
+            ))
+            basket.append(items)
+        with transaction.atomic():
+            objects = OrderModel.objects.bulk_create(objects)
+            order_items = OrderItemModel.objects.bulk_create([
+                OrderItemModel(order_id=order.pk, product_id=product_id, quantity=rng.randint(1, 5))
+                for order, items in zip(objects, basket) for product_id, _ in items
+            ])
+        order_count += len(objects)
+        item_count += len(order_items)
+    created['orders'] = order_count
+    created['order_items'] = item_count
+    log(f"{order_count} orders with {item_count} items")
+    return created
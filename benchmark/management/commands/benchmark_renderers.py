@@ -0,0 +1,59 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from rest_framework.renderers import JSONRenderer
+from config.fieldsets import sparse_queryset
+from config.renderers import ORJSONRenderer
+from order.serializers import OrderModelSerializer
+from order.views import order_queryset
+from order.models import OrderModel
+from product.models import ProductModel
+from product.serializers import ProductModelSerializer
+
+
+class Command(BaseCommand):
+    help = "Compare stdlib and orjson encode time on product and order list payloads"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=200, help="Products per list payload")
+        parser.add_argument('--iterations', type=int, default=200)
+
+    def payloads(self, size):
+        products = sparse_queryset(ProductModel.objects.all(), ProductModelSerializer, None, ['market'])
+        products = list(products.order_by('-rank_score', '-id')[:size])
+        if not products:
+            raise CommandError("No products; run seed_dataset first")
+        busiest = OrderModel.objects.values('user').annotate(total=Count('id')).order_by('-total').first()
+        orders = order_queryset(None, ['product', 'market', 'user_address']).filter(user=busiest['user'])
+        return {
+            'product_list': {"products": ProductModelSerializer(products, many=True).data, "next_cursor": None},
+            'product_list_flat': {
+                "products": ProductModelSerializer(products, many=True, expand=[]).data, "next_cursor": None
+            },
+            'order_list': {
+                "orders": OrderModelSerializer(
+                    orders, many=True, expand=['product', 'market', 'user_address']
+                ).data
+            },
+        }
+
+    def time(self, renderer, data, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            renderer.render(data)
+        return (time.perf_counter() - start) / iterations * 1000
+
+    def handle(self, *args, **options):
+        report = {}
+        for name, data in self.payloads(options['products']).items():
+            stdlib = self.time(JSONRenderer(), data, options['iterations'])
+            fast = self.time(ORJSONRenderer(), data, options['iterations'])
+            report[name] = {
+                'bytes': len(JSONRenderer().render(data)),
+                'stdlib_ms': round(stdlib, 3),
+                'orjson_ms': round(fast, 3),
+                'speedup': round(stdlib / fast, 1),
+            }
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,79 @@
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a worker does before serving its first request
+BOOT = (
+    "from django.core.wsgi import get_wsgi_application; get_wsgi_application(); "
+    "from django.urls import get_resolver; get_resolver().url_patterns"
+)
+_LINE_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def profile_boot():
+    """``(wall seconds, {module: (self us, cumulative us, depth)})`` of one ``python -X importtime`` boot."""
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings')}
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BOOT],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    if result.returncode:
+        raise CommandError(result.stderr[-2000:])
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            modules[match[4]] = (int(match[1]), int(match[2]), len(match[3]))
+    return wall, modules
+
+
+class Command(BaseCommand):
+    help = "Profile worker boot (django setup and URLconf) with -X importtime and report import cost as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=7)
+        parser.add_argument('--top', type=int, default=15, help="Packages to list by import time")
+        parser.add_argument('--output', help="Write the JSON report to this file instead of stdout")
+
+    def handle(self, *args, **options):
+        walls, imports, packages = [], [], defaultdict(list)
+        for _ in range(options['runs']):
+            wall, modules = profile_boot()
+            walls.append(wall)
+            imports.append(sum(cumulative for _, cumulative, depth in modules.values() if depth == 1))
+            totals = defaultdict(int)
+            for name, (self_us, _, _) in modules.items():
+                totals[name.split('.')[0]] += self_us
+            for package, total in totals.items():
+                packages[package].append(total)
+
+        median = {package: statistics.median(values + [0] * (options['runs'] - len(values)))
+                  for package, values in packages.items()}
+        report = {
+            'runs': options['runs'],
+            'wall_ms': round(statistics.median(walls) * 1000, 1),
+            'imports_ms': round(statistics.median(imports) / 1000, 1),
+            'modules': len(modules),
+            'drf_yasg_loaded': any(name.startswith('drf_yasg') for name in modules),
+            'packages_ms': {
+                package: round(us / 1000, 1)
+                for package, us in sorted(median.items(), key=lambda item: -item[1])[:options['top']]
+            },
+        }
+        content = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(content)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(content)
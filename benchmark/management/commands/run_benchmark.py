@@ -0,0 +1,49 @@
+import json
+import platform
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from benchmark.runner import compare, run
+
+
+class Command(BaseCommand):
+    help = "Benchmark every API endpoint through the test client and report latency percentiles as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=100)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--cold', action='store_true', help="Clear the catalog cache before every request")
+        parser.add_argument('--only', nargs='+', help="Only routes containing one of these strings")
+        parser.add_argument('--output', help="Write the JSON report to this file instead of stdout")
+        parser.add_argument('--compare', help="Previous JSON report to compare p95 latencies against")
+
+    def handle(self, *args, **options):
+        progress = self.stderr.write if not options['output'] else self.stdout.write
+        report = run(
+            iterations=options['iterations'], warmup=options['warmup'], cold=options['cold'],
+            only=options['only'], log=progress,
+        )
+        report['meta'] = {
+            'started_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': settings.DATABASES['default']['ENGINE'],
+            'debug': settings.DEBUG,
+        }
+        if report['uncovered']:
+            progress(self.style.WARNING(f"Routes without a scenario: {', '.join(report['uncovered'])}"))
+        if options['compare']:
+            with open(options['compare']) as baseline:
+                for endpoint, before, after, ratio in compare(json.load(baseline), report):
+                    style = self.style.ERROR if ratio > 1.2 else self.style.SUCCESS
+                    progress(style(f"{endpoint:45} p95 {before:8.2f} -> {after:8.2f} ms ({ratio:.2f}x)"))
+
+        content = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(content)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(content)
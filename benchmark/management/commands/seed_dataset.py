@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+from config.cache import invalidate
+from benchmark.dataset import PASSWORD, seed
+
+
+class Command(BaseCommand):
+    help = "Bulk insert a synthetic dataset of the given size for benchmarking"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--markets', type=int, default=1000)
+        parser.add_argument('--products', type=int, default=100000)
+        parser.add_argument('--rates', type=int, default=1000000)
+        parser.add_argument('--orders', type=int, default=200000)
+        parser.add_argument('--items-per-order', type=int, default=3)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, help="Random seed, for reproducible datasets")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        created = seed(
+            users=options['users'], markets=options['markets'], products=options['products'],
+            rates=options['rates'], orders=options['orders'], items_per_order=options['items_per_order'],
+            batch_size=options['batch_size'], seed=options['seed'], log=self.stdout.write,
+        )
+        invalidate('product', 'market', 'rate')
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {sum(created.values())} rows in {time.perf_counter() - start:.1f}s; "
+            f"every benchmark user's password is {PASSWORD!r}"
+        ))
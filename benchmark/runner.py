@@ -0,0 +1,243 @@
+import io
+import json
+import logging
+import statistics
+import time
+from collections import Counter
+from contextlib import contextmanager, redirect_stdout
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import URLResolver, get_resolver
+from rest_framework_simplejwt.tokens import RefreshToken
+from config.cache import catalog_cache
+from market.models import MarketModel
+from order.models import OrderItemModel, OrderModel
+from product.models import ProductModel
+from rate.models import RateModel
+from user.models import OTP, User, UserAddress
+from .dataset import PASSWORD
+
+APPS = ('user', 'market', 'product', 'rate', 'order', 'sync')
+BENCHMARK_PHONE = '99800000000'
+
+
+class Fixtures:
+    """
+    Rows the scenarios point at, preferring a seeded user that has orders.
+    Created or modified inside the benchmark's outer transaction, which is
+    rolled back at the end.
+    """
+
+    def __init__(self):
+        orders = OrderModel.objects.select_related('user', 'user_address').order_by('id')
+        order = orders.filter(user_address__latitude__isnull=False).first() or orders.first()
+        if order is None:
+            order = self._create_order()
+        self.user = order.user
+        self.user.set_password(PASSWORD)
+        self.user.is_verify = True
+        User.objects.filter(phone_number=BENCHMARK_PHONE).exclude(id=self.user.id).update(phone_number=None)
+        self.user.phone_number = BENCHMARK_PHONE
+        self.user.save()
+        self.address = order.user_address
+        self.order = order
+        self.item = order.orderitemmodel_set.first() or OrderItemModel.objects.create(
+            order=order, product_id=order.product_id, quantity=1
+        )
+        self.product = ProductModel.objects.get(id=order.product_id)
+        self.market = MarketModel.objects.get(id=order.market_id)
+        self.rate = RateModel.objects.filter(user=self.user).first() or RateModel.objects.create(
+            product=self.product, user=self.user, message='benchmark', rate=5
+        )
+        self.product_ids = list(ProductModel.objects.order_by('id').values_list('id', flat=True)[:40])
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+
+    def _create_order(self):
+        user = User.objects.create(username='benchmark')
+        address = UserAddress.objects.create(user=user, street='Amir Temur 1', location={'lat': 41.31, 'lng': 69.28})
+        market = MarketModel.objects.create(name='Benchmark market', description='', location='41.31, 69.28')
+        product = ProductModel.objects.create(
+            market=market, name='Benchmark product', description='', category='Benchmark', price=1000, discount=0
+        )
+        order = OrderModel.objects.create(product=product, market=market, user=user, user_address=address)
+        OrderItemModel.objects.create(order=order, product=product, quantity=1)
+        return order
+
+    def otp(self):
+        otp = OTP.objects.create(user=self.user, code=1234)
+        return {'key': str(otp.key), 'otp_code': 1234}
+
+    def csv_upload(self):
+        content = b'sku,name,description,category,price,discount,available\n'
+        content += b''.join(b'bench-%d,Benchmark %d,,Benchmark,1000,0,true\n' % (i, i) for i in range(100))
+        return {'market': self.market.id, 'file': SimpleUploadedFile('products.csv', content, 'text/csv')}
+
+
+def scenarios(fx):
+    """
+    ``(route, method, path, data)`` for every benchmarked endpoint; ``data``
+    is a dict sent as JSON, a callable returning multipart data, or None.
+    """
+    address = {'street': 'Benchmark 1', 'location': {'lat': 41.31, 'lng': 69.28}}
+    ids = ','.join(map(str, fx.product_ids))
+    return [
+        ('user/signup/', 'post', '/user/signup/', {'username': 'benchmark_signup', 'password': PASSWORD}),
+        ('user/login/', 'post', '/user/login/', {'username': fx.user.username, 'password': PASSWORD}),
+        ('user/verify-otp/', 'post', '/user/verify-otp/', fx.otp),
+        ('user/me/', 'get', '/user/me/', None),
+        ('user/reset-password/', 'post', '/user/reset-password/', {'phone': BENCHMARK_PHONE}),
+        ('user/update-password/', 'patch', '/user/update-password/',
+         {'old_password': PASSWORD, 'new_password': PASSWORD, 'confirm_password': PASSWORD}),
+        ('user/update-user/', 'patch', '/user/update-user/', {'first_name': 'Benchmark'}),
+        ('user/address/create/', 'post', '/user/address/create/', address),
+        ('user/address/list/', 'get', '/user/address/list/', None),
+        ('user/address/<int:pk>/update/', 'put', f'/user/address/{fx.address.id}/update/', address),
+        ('user/address/<int:pk>/delete/', 'delete', f'/user/address/{fx.address.id}/delete/', None),
+        ('market/create/', 'post', '/market/create/',
+         {'name': 'Benchmark market', 'description': 'benchmark', 'location': '41.31, 69.28'}),
+        ('market/markets/', 'get', '/market/markets/', None),
+        ('market/nearby/', 'get', f'/market/nearby/?address={fx.address.id}&radius=5', None),
+        ('market/<int:pk>/', 'get', f'/market/{fx.market.id}/', None),
+        ('market/<int:pk>/update/', 'patch', f'/market/{fx.market.id}/update/', {'description': 'benchmark'}),
+        ('market/<int:pk>/delete/', 'delete', f'/market/{fx.market.id}/delete/', None),
+        ('product/create/', 'post', '/product/create/',
+         {'name': 'Benchmark', 'description': '', 'category': 'Benchmark', 'price': 1000, 'discount': 0}),
+        ('product/import/', 'post', '/product/import/', fx.csv_upload),
+        ('product/export/', 'get', f'/product/export/?market={fx.market.id}', None),
+        ('product/products/', 'get', '/product/products/', None),
+        ('product/batch/', 'get', f'/product/batch/?ids={ids}', None),
+        ('product/<int:pk>/', 'get', f'/product/{fx.product.id}/', None),
+        ('product/<int:pk>/update/', 'patch', f'/product/{fx.product.id}/update/', {'price': 2000}),
+        ('product/<int:pk>/delete/', 'delete', f'/product/{fx.product.id}/delete/', None),
+        ('rate/create/', 'post', '/rate/create/', {'product': fx.product.id, 'message': 'benchmark', 'rate': 4}),
+        ('rate/rates/', 'get', f'/rate/rates/?product={fx.product.id}', None),
+        ('rate/<int:pk>/', 'get', f'/rate/{fx.rate.id}/', None),
+        ('rate/<int:pk>/update/', 'patch', f'/rate/{fx.rate.id}/update/', {'rate': 3}),
+        ('rate/<int:pk>/delete/', 'delete', f'/rate/{fx.rate.id}/delete/', None),
+        ('order/create/', 'post', '/order/create/', {
+            'items': [{'product': pk, 'quantity': 1} for pk in fx.product_ids[:3]],
+            'market': fx.market.id, 'user_address': fx.address.id,
+        }),
+        ('order/orders/', 'get', '/order/orders/', None),
+        ('order/<int:pk>/', 'get', f'/order/{fx.order.id}/', None),
+        ('order/update/<int:pk>/', 'patch', f'/order/update/{fx.order.id}/', {'market': fx.market.id}),
+        ('order/delete/<int:pk>/', 'delete', f'/order/delete/{fx.order.id}/', None),
+        ('order/item/update/<int:pk>/', 'patch', f'/order/item/update/{fx.item.id}/', {'quantity': 2}),
+        ('order/item/delete/<int:pk>/', 'delete', f'/order/item/delete/{fx.item.id}/', None),
+        ('sync/changes/', 'get', '/sync/changes/?since=0', None),
+    ]
+
+
+def app_routes():
+    """Routes of ``APPS`` in config.urls, as ``'product/<int:pk>/'`` strings."""
+    routes = []
+    for resolver in get_resolver().url_patterns:
+        prefix = str(resolver.pattern)
+        if isinstance(resolver, URLResolver) and prefix.rstrip('/') in APPS:
+            routes += [prefix + str(pattern.pattern) for pattern in resolver.url_patterns]
+    return routes
+
+
+@contextmanager
+def _quiet(name):
+    logger = logging.getLogger(name)
+    level = logger.level
+    logger.setLevel(logging.CRITICAL)
+    try:
+        yield
+    finally:
+        logger.setLevel(level)
+
+
+def _percentile(sorted_values, percent):
+    index = max(0, min(len(sorted_values) - 1, round(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _request(client, method, path, data, headers):
+    if callable(data):
+        return getattr(client, method)(path, data(), **headers)
+    if data is None:
+        return getattr(client, method)(path, **headers)
+    return getattr(client, method)(path, json.dumps(data), content_type='application/json', **headers)
+
+
+def measure(client, method, path, data, headers, iterations, warmup, cold):
+    timings, statuses = [], Counter()
+    for i in range(warmup + iterations):
+        if cold:
+            catalog_cache().clear()
+        with transaction.atomic():
+            start = time.perf_counter()
+            response = _request(client, method, path, data, headers)
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+            elapsed = time.perf_counter() - start
+            transaction.set_rollback(True)
+        if i >= warmup:
+            timings.append(elapsed)
+            statuses[response.status_code] += 1
+    timings.sort()
+    return {
+        'requests': iterations,
+        'status': {str(code): count for code, count in sorted(statuses.items())},
+        'throughput_rps': round(iterations / sum(timings), 1),
+        'mean_ms': round(statistics.fmean(timings) * 1000, 3),
+        'p50_ms': round(_percentile(timings, 50) * 1000, 3),
+        'p95_ms': round(_percentile(timings, 95) * 1000, 3),
+        'p99_ms': round(_percentile(timings, 99) * 1000, 3),
+        'max_ms': round(timings[-1] * 1000, 3),
+    }
+
+
+def run(iterations=100, warmup=5, cold=False, only=None, log=None):
+    """
+    Drive every scenario through the test client and return the report.
+    Each request runs in a transaction that is rolled back, and so is the
+    whole run, so writes never change the dataset.
+    """
+    log = log or (lambda message: None)
+    client = Client(raise_request_exception=False)
+    report = {
+        'iterations': iterations,
+        'cold_cache': cold,
+        'dataset': {
+            'users': User.objects.count(), 'markets': MarketModel.objects.count(),
+            'products': ProductModel.objects.count(), 'rates': RateModel.objects.count(),
+            'orders': OrderModel.objects.count(), 'order_items': OrderItemModel.objects.count(),
+        },
+        'endpoints': {},
+    }
+    # the login/signup/OTP buckets would turn most iterations into 429s; keep the checks but never trip them
+    unthrottled = {scope: '1000000000/s' for scope in settings.THROTTLE_RATES}
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'], THROTTLE_RATES=unthrottled), \
+            transaction.atomic():
+        fx = Fixtures()
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {fx.token}'}
+        covered = set()
+        for route, method, path, data in scenarios(fx):
+            covered.add(route)
+            if only and not any(part in route for part in only):
+                continue
+            # signup prints OTP codes and failing endpoints log tracebacks; keep both out of the report
+            with redirect_stdout(io.StringIO()), _quiet('django.request'):
+                result = measure(client, method, path, data, headers, iterations, warmup, cold)
+            report['endpoints'][f'{method.upper()} /{route}'] = result
+            log(f"{method.upper():6} /{route:35} p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  {result['status']}")
+        report['uncovered'] = sorted(set(app_routes()) - covered)
+        transaction.set_rollback(True)
+    return report
+
+
+def compare(baseline, report):
+    """``(endpoint, baseline p95, current p95, ratio)`` for endpoints present in both reports."""
+    rows = []
+    for endpoint, result in report['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(endpoint)
+        if previous and previous['p95_ms']:
+            rows.append((endpoint, previous['p95_ms'], result['p95_ms'], result['p95_ms'] / previous['p95_ms']))
+    return rows
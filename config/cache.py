@@ -0,0 +1,120 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.http import HttpResponse
+
+
+def catalog_cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+# backends whose incr/decr are atomic across processes
+ATOMIC_BACKENDS = (
+    'django.core.cache.backends.redis.RedisCache',
+    'django.core.cache.backends.memcached.PyMemcacheCache',
+    'django.core.cache.backends.memcached.PyLibMCCache',
+)
+
+
+def require_shared_cache(setting, atomic=False):
+    """
+    Refuse to start with DEBUG off when the cache alias named by ``setting``
+    is private to each worker process, or, with ``atomic``, when its counters
+    are not atomic across processes.
+    """
+    if settings.DEBUG:
+        return
+    alias = getattr(settings, setting)
+    backend = settings.CACHES[alias]['BACKEND']
+    if backend in PROCESS_LOCAL_BACKENDS or (atomic and backend not in ATOMIC_BACKENDS):
+        needed = "Redis or Memcached" if atomic else "a cache shared by all workers"
+        raise ImproperlyConfigured(f"{setting} points at the {alias!r} cache ({backend}); it needs {needed}.")
+
+
+def _version_key(name):
+    return f'catalog:version:{name}'
+
+
+def get_versions(names, using=None):
+    """
+    Current version number of each model name, in the ``using`` cache alias
+    (CATALOG_CACHE_ALIAS by default). Missing versions start from the clock
+    so an evicted counter never falls back to a value that was already used
+    for cached responses.
+    """
+    cache = caches[using or settings.CATALOG_CACHE_ALIAS]
+    keys = [_version_key(name) for name in names]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*names, using=None):
+    cache = caches[using or settings.CATALOG_CACHE_ALIAS]
+    for name in names:
+        try:
+            cache.incr(_version_key(name))
+        except ValueError:
+            cache.set(_version_key(name), time.time_ns(), timeout=None)
+
+
+def invalidate(*names, using=None):
+    """Bump the given model versions once the current transaction commits."""
+    transaction.on_commit(lambda: bump_versions(*names, using=using))
+
+
+def _wants_json(request):
+    fmt = request.GET.get('format')
+    if fmt:
+        return fmt == 'json'
+    return 'text/html' not in request.META.get('HTTP_ACCEPT', '')
+
+
+def _response_key(view, request, kwargs, versions):
+    params = sorted((key, sorted(values)) for key, values in request.GET.lists())
+    raw = repr((view.__module__, view.__name__, sorted(kwargs.items()), params, versions))
+    return 'catalog:response:' + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def cache_response(*models):
+    """
+    Cache rendered JSON responses of a public GET view, keyed by the view,
+    its normalized query parameters, the versions of ``models`` and the ETag
+    ``conditional`` computed from the database. Writes call ``invalidate`` so
+    a new version makes every stale entry unreachable; writes that don't are
+    caught by the ETag.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method != 'GET' or not _wants_json(request):
+                return view(request, *args, **kwargs)
+            cache = catalog_cache()
+            state = (get_versions(models), getattr(request, 'conditional_etag', None))
+            key = _response_key(view, request, kwargs, state)
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+                response['Vary'] = 'Accept'
+                return response
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                if hasattr(response, 'render'):
+                    response.render()
+                cache.set(key, (response.content, response['Content-Type']), settings.CATALOG_CACHE_TIMEOUT)
+            return response
+        return wrapped
+    return decorator
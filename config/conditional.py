@@ -0,0 +1,76 @@
+import hashlib
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from config.cache import get_versions
+
+
+def queryset_state(queryset, relations=(), counts=(), versions=()):
+    """
+    ``(last_modified, token)`` for the rows a response is built from, in one
+    aggregate query: the newest ``updated_at`` of the rows and of each of
+    ``relations``, plus row counts of the queryset and of ``counts`` so that
+    deletions change the token as well. ``versions`` adds the
+    ``config.cache`` version counters of those model names.
+    """
+    # only reverse relations in ``counts`` can repeat a row
+    aggregates = {'count': Count('pk', distinct=bool(counts)), 'latest': Max('updated_at')}
+    for relation in relations:
+        aggregates[f'latest:{relation}'] = Max(f'{relation}__updated_at')
+    for relation in counts:
+        aggregates[f'count:{relation}'] = Count(relation, distinct=True)
+    state = queryset.order_by().aggregate(**aggregates)
+    stamps = [value for key, value in state.items() if key.startswith('latest') and value is not None]
+    token = sorted(state.items())
+    if versions:
+        token.append(('versions', get_versions(versions)))
+    return (max(stamps) if stamps else None), token
+
+
+def _etag(request, token):
+    user = getattr(request, 'user', None)
+    raw = repr((
+        token,
+        request.get_full_path(),
+        request.META.get('HTTP_ACCEPT', ''),
+        user.pk if user is not None and user.is_authenticated else None,
+    ))
+    return quote_etag(hashlib.sha1(raw.encode()).hexdigest())
+
+
+def conditional(state):
+    """
+    ETag / Last-Modified handling for GET views. ``state(request, *args,
+    **kwargs)`` returns ``queryset_state(...)`` for the rows behind the
+    response, or ``(None, None)`` for invalid input, which skips validation.
+    When the client's validators still match, a 304 is returned without
+    calling the view. The ETag is kept on ``request.conditional_etag`` so
+    ``cache_response`` never serves a body older than it.
+
+    Works outside ``api_view`` (catalog views, before the response cache) and
+    inside it, where ``request.user`` is already authenticated.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            last_modified, token = state(request, *args, **kwargs)
+            if token is None:
+                return view(request, *args, **kwargs)
+            etag = request.conditional_etag = _etag(request, token)
+            timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            if response.status_code not in (200, 304):
+                return response
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+            patch_vary_headers(response, ('Accept', 'Authorization'))
+            return response
+        return wrapped
+    return decorator
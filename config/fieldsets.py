@@ -0,0 +1,70 @@
+from rest_framework import serializers
+
+
+def parse_list_param(value):
+    if not value:
+        return []
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def sparse_params(request):
+    """``(fields, expand)`` from ``?fields=a,b&expand=market``; fields is None when not given."""
+    fields = parse_list_param(request.query_params.get('fields')) or None
+    return fields, parse_list_param(request.query_params.get('expand'))
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin for sparse fieldsets.
+
+    ``fields`` keeps only the named fields. ``expand`` lists which of
+    ``Meta.expandable_fields`` are rendered as nested objects; the others are
+    rendered as plain ids. ``expand=None`` leaves the declared fields as they
+    are, which is what detail views and writes use.
+
+    ``Meta.column_map`` names the model columns read by fields that are not
+    columns themselves (e.g. SerializerMethodFields).
+    """
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.expand = expand
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        if expand is not None:
+            for name, nested in getattr(self.Meta, 'expandable_fields', {}).items():
+                if name not in self.fields:
+                    continue
+                if name in expand:
+                    self.fields[name] = nested(read_only=True)
+                else:
+                    self.fields[name] = serializers.PrimaryKeyRelatedField(read_only=True)
+
+
+def serializer_columns(serializer, prefix=''):
+    """Model columns and select_related paths needed to render ``serializer``."""
+    columns, related = [], []
+    column_map = getattr(serializer.Meta, 'column_map', {})
+    for name, field in serializer.fields.items():
+        source = prefix + field.source.replace('.', '__')
+        if name in column_map:
+            columns += [prefix + column for column in column_map[name]]
+        elif isinstance(field, serializers.ListSerializer):
+            continue
+        elif isinstance(field, serializers.BaseSerializer):
+            nested_columns, nested_related = serializer_columns(field, source + '__')
+            columns += [source] + nested_columns
+            related += [source] + nested_related
+        elif field.source != '*':
+            columns.append(source)
+    return columns, related
+
+
+def sparse_queryset(queryset, serializer_class, fields=None, expand=None, required=()):
+    """Restrict ``queryset`` to the columns the sparse serializer will read."""
+    columns, related = serializer_columns(serializer_class(fields=fields, expand=expand))
+    queryset = queryset.select_related(None)
+    if related:
+        queryset = queryset.select_related(*related)
+    return queryset.only('pk', *columns, *required)
@@ -0,0 +1,61 @@
+import json
+import math
+import re
+
+EARTH_RADIUS_KM = 6371.0088
+# only a bare decimal pair; addresses such as "Amir Temur 15, dom 3" also hold two numbers
+_PAIR_RE = re.compile(r'^\s*(-?\d+\.\d+)\s*,\s*(-?\d+\.\d+)\s*$')
+
+
+def _coordinates(lat, lng):
+    try:
+        lat, lng = float(lat), float(lng)
+    except (TypeError, ValueError):
+        return None, None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None, None
+    return lat, lng
+
+
+def parse_location(value):
+    """
+    ``(latitude, longitude)`` from the free-form locations stored so far:
+    ``{"lat": .., "lng": ..}`` (or latitude/longitude, lon), ``[lat, lng]``
+    or a ``"41.31, 69.24"`` string of two decimals, possibly JSON-encoded.
+    ``(None, None)`` for anything else, including street addresses.
+    """
+    if isinstance(value, str):
+        try:
+            decoded = json.loads(value)
+        except ValueError:
+            decoded = None
+        if isinstance(decoded, (dict, list)):
+            value = decoded
+        else:
+            match = _PAIR_RE.match(decoded if isinstance(decoded, str) else value)
+            return _coordinates(*match.groups()) if match else (None, None)
+    if isinstance(value, dict):
+        lat = next((value[key] for key in ('lat', 'latitude') if key in value), None)
+        lng = next((value[key] for key in ('lng', 'lon', 'long', 'longitude') if key in value), None)
+        return _coordinates(lat, lng)
+    if isinstance(value, (list, tuple)) and len(value) == 2:
+        return _coordinates(*value)
+    return None, None
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat, lng, radius_km):
+    """``(min_lat, max_lat, min_lng, max_lng)`` enclosing the circle; spans all longitudes near the poles or the antimeridian."""
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = max(lat - delta_lat, -90.0), min(lat + delta_lat, 90.0)
+    if min_lat <= -90 or max_lat >= 90:
+        return min_lat, max_lat, -180.0, 180.0
+    delta_lng = math.degrees(math.asin(min(1.0, math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(lat)))))
+    if lng - delta_lng < -180 or lng + delta_lng > 180:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, lng - delta_lng, lng + delta_lng
@@ -0,0 +1,142 @@
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_safe
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+HISTOGRAMS = {
+    'http_request_duration_seconds': ("Request latency by URL name, method and status.", LATENCY_BUCKETS),
+    'http_request_db_duration_seconds': ("Time spent executing SQL per request.", LATENCY_BUCKETS),
+    'http_response_size_bytes': ("Response body size; streamed bodies are measured as sent.", SIZE_BUCKETS),
+}
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS metrics (
+    name TEXT NOT NULL, labels TEXT NOT NULL, le TEXT NOT NULL, value REAL NOT NULL,
+    PRIMARY KEY (name, labels, le)
+) WITHOUT ROWID
+"""
+_UPSERT = """
+INSERT INTO metrics (name, labels, le, value) VALUES (?, ?, ?, ?)
+ON CONFLICT (name, labels, le) DO UPDATE SET value = value + excluded.value
+"""
+
+
+def _le(bound):
+    return '+Inf' if bound is None else repr(float(bound))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def labels(**values):
+    """Prometheus label set, rendered once so it can be used as a key: ``method="GET",view="product-list"``."""
+    return ','.join(f'{key}="{_escape(value)}"' for key, value in sorted(values.items()))
+
+
+class Registry:
+    """
+    Histograms kept in memory per process and added into a shared SQLite
+    file (METRICS_DB) at most every METRICS_FLUSH_SECONDS, so every worker
+    on the host reports into the same totals. Buckets are stored
+    non-cumulative; ``render()`` accumulates them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = defaultdict(float)
+        self._flushed_at = time.monotonic()
+        self._connection = None
+        self._pid = None
+
+    def observe(self, name, label_set, value):
+        buckets = HISTOGRAMS[name][1]
+        index = bisect_left(buckets, value)
+        le = _le(buckets[index] if index < len(buckets) else None)
+        with self._lock:
+            self._pending[(name, label_set, le)] += 1
+            self._pending[(name, label_set, 'sum')] += value
+            self._pending[(name, label_set, 'count')] += 1
+
+    def _db(self):
+        # a forked worker must not share its parent's SQLite handle
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(str(settings.METRICS_DB), timeout=5, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(_CREATE_TABLE)
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    def flush(self, force=False):
+        if not force and time.monotonic() - self._flushed_at < settings.METRICS_FLUSH_SECONDS:
+            return
+        with self._lock:
+            self._flushed_at = time.monotonic()
+            if not self._pending:
+                return
+            rows = [(*key, value) for key, value in self._pending.items()]
+            try:
+                with self._db() as connection:
+                    connection.executemany(_UPSERT, rows)
+            except sqlite3.Error:
+                logger.warning("Could not write metrics to %s", settings.METRICS_DB, exc_info=True)
+                return
+            self._pending.clear()
+
+    def render(self):
+        """All workers' histograms in the Prometheus text exposition format."""
+        self.flush(force=True)
+        with self._lock:
+            rows = self._db().execute('SELECT name, labels, le, value FROM metrics').fetchall()
+        series = defaultdict(lambda: defaultdict(dict))
+        for name, label_set, le, value in rows:
+            series[name][label_set][le] = value
+
+        lines = []
+        for name, (help_text, buckets) in HISTOGRAMS.items():
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+            for label_set, values in sorted(series[name].items()):
+                prefix = f'{label_set},' if label_set else ''
+                cumulative = 0
+                for bound in (*buckets, None):
+                    cumulative += values.get(_le(bound), 0)
+                    lines.append(f'{name}_bucket{{{prefix}le="{_le(bound)}"}} {int(cumulative)}')
+                lines.append(f'{name}_sum{{{label_set}}} {values.get("sum", 0):.6f}')
+                lines.append(f'{name}_count{{{label_set}}} {int(values.get("count", 0))}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+atexit.register(registry.flush, force=True)
+
+
+@require_safe
+def metrics(request):
+    """
+    Prometheus scrape endpoint; requires ``Authorization: Bearer <METRICS_TOKEN>``
+    when that is set and is closed without a token unless DEBUG is on.
+    """
+    if settings.METRICS_TOKEN:
+        authorized = constant_time_compare(
+            request.headers.get('Authorization', ''), f'Bearer {settings.METRICS_TOKEN}'
+        )
+    else:
+        authorized = settings.DEBUG
+    if not authorized:
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,179 @@
+import heapq
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from config.metrics import labels, registry
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST_RE = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+
+
+def execute_wrappers(wrapper):
+    """ExitStack keeping ``wrapper`` installed on every database connection until it is closed."""
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(wrapper))
+    return stack
+
+
+def wrap_stream(response, wrapper, finished):
+    """
+    Keep ``wrapper`` installed while a streamed body is sent, so queries made
+    by the body's generator are seen too, then call ``finished(size)`` with
+    the number of bytes sent once the body is exhausted or closed.
+    """
+    def stream(content):
+        size = 0
+        try:
+            with execute_wrappers(wrapper):
+                for chunk in content:
+                    size += len(chunk)
+                    yield chunk
+        finally:
+            finished(size)
+
+    response.streaming_content = stream(response.streaming_content)
+
+
+def query_shape(sql):
+    """``sql`` with placeholder lists collapsed, so ``IN (%s, %s)`` and ``IN (%s)`` count as one shape."""
+    return _IN_LIST_RE.sub('(...)', sql)
+
+
+class QueryRecorder:
+    """Execute wrapper collecting count, total time, repeated statements and the slowest ones."""
+
+    def __init__(self, keep_slowest):
+        self.keep_slowest = keep_slowest
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+        self.slowest = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.duration += duration
+            self.statements[sql] += 1
+            if len(self.slowest) < self.keep_slowest:
+                heapq.heappush(self.slowest, (duration, self.count, sql))
+            elif duration > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, (duration, self.count, sql))
+
+    def repeated(self, threshold):
+        shapes = Counter()
+        for sql, count in self.statements.items():
+            shapes[query_shape(sql)] += count
+        return [(shape, count) for shape, count in shapes.most_common() if count >= threshold]
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Record the SQL issued by a sampled share of requests
+    (SQL_INSTRUMENTATION_SAMPLE_RATE) and report it in ``Server-Timing`` and
+    ``X-DB-*`` headers. Statement shapes repeated at least
+    SQL_INSTRUMENTATION_N_PLUS_ONE_THRESHOLD times are logged as suspected
+    N+1 queries; the slowest statements are logged at debug level.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.SQL_INSTRUMENTATION_SAMPLE_RATE:
+            return self.get_response(request)
+
+        recorder = QueryRecorder(settings.SQL_INSTRUMENTATION_SLOWEST)
+        start = time.perf_counter()
+        with execute_wrappers(recorder):
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        # headers of a streamed response leave before its body runs its queries;
+        # they cover the view only, the log covers the whole response
+        repeated = recorder.repeated(settings.SQL_INSTRUMENTATION_N_PLUS_ONE_THRESHOLD)
+        response['Server-Timing'] = (
+            f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries", app;dur={total * 1000:.1f}'
+        )
+        response['X-DB-Query-Count'] = str(recorder.count)
+        response['X-DB-Time-Ms'] = f'{recorder.duration * 1000:.1f}'
+        response['X-DB-Slowest-Ms'] = ','.join(
+            f'{duration * 1000:.1f}' for duration, _, _ in sorted(recorder.slowest, reverse=True)
+        )
+        if repeated:
+            response['X-DB-N-Plus-One'] = str(len(repeated))
+        if response.streaming and not response.is_async:
+            wrap_stream(response, recorder, lambda size: self.log(request, recorder))
+        else:
+            self.log(request, recorder)
+        return response
+
+    def log(self, request, recorder):
+        for shape, count in recorder.repeated(settings.SQL_INSTRUMENTATION_N_PLUS_ONE_THRESHOLD):
+            logger.warning("Suspected N+1 on %s %s: %d x %s", request.method, request.path, count, shape)
+        if logger.isEnabledFor(logging.DEBUG):
+            for duration, _, sql in sorted(recorder.slowest, reverse=True):
+                logger.debug("Slow query on %s %s: %.1f ms %s", request.method, request.path, duration * 1000, sql)
+
+
+class _DBTimer:
+    def __init__(self):
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+
+
+class MetricsMiddleware:
+    """
+    Record latency, DB time and response size of every request in
+    ``config.metrics.registry``, labelled by URL name (``product-list``,
+    ``create_order``, ...), method and status. Scraped at ``/metrics``.
+    Streamed responses are recorded when their body finishes, including the
+    queries the body ran.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = _DBTimer()
+        start = time.perf_counter()
+        with execute_wrappers(timer):
+            response = self.get_response(request)
+
+        if not response.streaming:
+            self.observe(request, response, start, timer, len(response.content))
+        elif not response.is_async:
+            # a streamed response is observed once its body has been sent
+            wrap_stream(response, timer, lambda size: self.observe(request, response, start, timer, size))
+        return response
+
+    def observe(self, request, response, start, timer, size):
+        duration = time.perf_counter() - start
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        registry.observe(
+            'http_request_duration_seconds',
+            labels(view=view, method=request.method, status=response.status_code),
+            duration,
+        )
+        view_labels = labels(view=view, method=request.method)
+        registry.observe('http_request_db_duration_seconds', view_labels, timer.duration)
+        registry.observe('http_response_size_bytes', view_labels, size)
+        registry.flush()
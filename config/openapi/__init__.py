@@ -0,0 +1,78 @@
+"""
+Schema declarations that do not import drf_yasg.
+
+Views use ``openapi`` and ``swagger_auto_schema`` from here exactly like the
+drf_yasg ones: ``openapi.Parameter(...)``, ``openapi.TYPE_STRING`` and so on
+are recorded as ``Deferred`` values, and the decorator only remembers the
+view. ``materialize()`` builds the real objects and applies drf_yasg's
+decorator the first time a schema is generated (see ``generators``).
+"""
+import threading
+
+_pending = []
+_lock = threading.Lock()
+
+
+class Deferred:
+    """``openapi.<name>``, or a call of it, resolved against ``drf_yasg.openapi`` on demand."""
+
+    __slots__ = ('name', 'call')
+
+    def __init__(self, name, call=None):
+        self.name = name
+        self.call = call
+
+    def __call__(self, *args, **kwargs):
+        return Deferred(self.name, (args, kwargs))
+
+    def __repr__(self):
+        return f'openapi.{self.name}' + ('(...)' if self.call else '')
+
+    def resolve(self):
+        from drf_yasg import openapi as _openapi
+
+        value = getattr(_openapi, self.name)
+        if self.call is None:
+            return value
+        args, kwargs = self.call
+        return value(*resolve(args), **resolve(kwargs))
+
+
+def resolve(value):
+    """``value`` with every ``Deferred`` inside it replaced by the real object."""
+    if isinstance(value, Deferred):
+        return value.resolve()
+    if isinstance(value, dict):
+        return {key: resolve(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(resolve(item) for item in value)
+    return value
+
+
+class _LazyOpenAPI:
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return Deferred(name)
+
+
+openapi = _LazyOpenAPI()
+
+
+def swagger_auto_schema(**kwargs):
+    """Record drf_yasg's ``swagger_auto_schema(**kwargs)`` for ``view`` and return the view unchanged."""
+    def decorator(view):
+        _pending.append((view, kwargs))
+        return view
+    return decorator
+
+
+def materialize():
+    if not _pending:
+        return
+    from drf_yasg.utils import swagger_auto_schema as _swagger_auto_schema
+
+    with _lock:
+        while _pending:
+            view, kwargs = _pending.pop(0)
+            _swagger_auto_schema(**resolve(kwargs))(view)
@@ -0,0 +1,16 @@
+import importlib.util
+
+from django.apps import AppConfig
+
+
+class OpenAPIConfig(AppConfig):
+    """
+    Registers drf_yasg's templates, static files and commands without
+    importing the package: its ``__init__`` pulls in ``pkg_resources``,
+    which alone costs more than the rest of drf_yasg at startup.
+    """
+
+    name = 'config.openapi'
+    label = 'drf_yasg'
+    verbose_name = 'drf_yasg'
+    path = importlib.util.find_spec('drf_yasg').submodule_search_locations[0]
@@ -0,0 +1,11 @@
+from drf_yasg.generators import OpenAPISchemaGenerator
+
+from . import materialize
+
+
+class LazySchemaGenerator(OpenAPISchemaGenerator):
+    """Applies the recorded ``swagger_auto_schema`` declarations before the first schema is built."""
+
+    def get_schema(self, request=None, public=False):
+        materialize()
+        return super().get_schema(request, public)
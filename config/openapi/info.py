@@ -0,0 +1,10 @@
+from drf_yasg import openapi
+
+api_info = openapi.Info(
+    title="Dommaster APIv1",
+    default_version="v1",
+    description="API for project Dommaster",
+    terms_of_service="",
+    contact=openapi.Contact(email="email@gmail.com"),
+    license=openapi.License(name="BSD License"),
+)
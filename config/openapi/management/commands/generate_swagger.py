@@ -0,0 +1,2 @@
+# drf_yasg is registered through config.openapi.apps, so its commands are loaded from here
+from drf_yasg.management.commands.generate_swagger import Command  # noqa: F401
@@ -0,0 +1,93 @@
+import base64
+import json
+import math
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+
+NUMBER = (int, float)
+
+
+class PaginationError(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, types):
+    """Values of ``cursor``, one per entry of ``types`` and each an instance of it."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except ValueError:
+        raise PaginationError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(types):
+        raise PaginationError("Invalid cursor")
+    for value, expected in zip(values, types):
+        # bool is an int subclass, but true/false are never valid keys
+        if isinstance(value, bool) or not isinstance(value, expected):
+            raise PaginationError("Invalid cursor")
+        # keep numbers within what the database can bind
+        if isinstance(value, int) and not -2 ** 63 <= value < 2 ** 63:
+            raise PaginationError("Invalid cursor")
+        if isinstance(value, float) and not math.isfinite(value):
+            raise PaginationError("Invalid cursor")
+    return values
+
+
+def _cursor_type(field):
+    if isinstance(field, models.IntegerField):
+        return int
+    if isinstance(field, models.FloatField):
+        return NUMBER
+    return str
+
+
+def parse_limit(value, default=None, maximum=None):
+    if value in (None, ''):
+        return default or settings.PAGINATION_DEFAULT_LIMIT
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise PaginationError("limit must be an integer")
+    if limit < 1:
+        raise PaginationError("limit must be positive")
+    return min(limit, maximum or settings.PAGINATION_MAX_LIMIT)
+
+
+def _after(ordering, values):
+    """Rows that come strictly after ``values`` in ``ordering``."""
+    condition = Q()
+    for i, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        step = Q(**{f'{name}__{lookup}': values[i]})
+        for previous, value in zip(ordering[:i], values):
+            step &= Q(**{previous.lstrip('-'): value})
+        condition |= step
+    first = ordering[0].lstrip('-')
+    bound = 'lte' if ordering[0].startswith('-') else 'gte'
+    # Redundant bound on the leading column so the planner can range-scan the index
+    return Q(**{f'{first}__{bound}': values[0]}) & condition
+
+
+def paginate_keyset(queryset, ordering, cursor=None, limit=None):
+    """
+    Return ``(page, next_cursor)`` for ``queryset`` sorted by ``ordering``.
+    The last column of ``ordering`` must be unique (normally ``id``).
+    """
+    limit = parse_limit(limit)
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        types = [_cursor_type(queryset.model._meta.get_field(field.lstrip('-'))) for field in ordering]
+        queryset = queryset.filter(_after(ordering, decode_cursor(cursor, types)))
+    page = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        last = page[-1]
+        next_cursor = encode_cursor([getattr(last, field.lstrip('-')) for field in ordering])
+    return page, next_cursor
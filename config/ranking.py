@@ -0,0 +1,16 @@
+from django.conf import settings
+
+
+def prior_score():
+    """``rank_score`` of a product or market without ratings."""
+    return float(settings.RANKING_PRIOR_MEAN) if settings.RANKING_PRIOR_WEIGHT else 0.0
+
+
+def bayesian_score(rating_sum, rating_count):
+    """
+    Average of the ratings plus RANKING_PRIOR_WEIGHT pseudo-ratings of
+    RANKING_PRIOR_MEAN, so a single 5 does not outrank a thousand 4.9s.
+    Works on numbers and on expressions; callers handle a zero count.
+    """
+    weight = float(settings.RANKING_PRIOR_WEIGHT)
+    return (weight * float(settings.RANKING_PRIOR_MEAN) + rating_sum) / (weight + rating_count)
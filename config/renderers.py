@@ -0,0 +1,57 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_encoder = JSONEncoder()
+
+
+def _default(obj):
+    # Same conversions as DRF's encoder: datetimes in DRF's format, Decimal,
+    # lazy translation strings, querysets, generators, ...
+    return _encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed. Indented
+    output (the browsable API, ``; indent=`` in Accept), non-compact or
+    ASCII-only settings, a missing orjson and data orjson refuses (integers
+    outside 64 bits) fall back to the stdlib encoder.
+
+    Output matches JSONRenderer except for non-finite floats: orjson writes
+    NaN and Infinity as ``null`` where the stdlib writes ``NaN``/``Infinity``.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or not (api_settings.COMPACT_JSON and api_settings.UNICODE_JSON)
+            or self.get_indent(accepted_media_type or '', renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            return orjson.dumps(
+                data, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser that decodes with orjson when it is installed."""
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
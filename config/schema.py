@@ -0,0 +1,98 @@
+import hashlib
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_safe
+from rest_framework import permissions
+
+logger = logging.getLogger(__name__)
+
+# URL suffix -> (generate_swagger format, content type)
+FORMATS = {
+    '.json': ('json', 'application/json'),
+    '.yaml': ('yaml', 'application/yaml'),
+}
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def schema_path(suffix):
+    return os.path.join(settings.OPENAPI_SCHEMA_DIR, f'swagger{suffix}')
+
+
+def write_schema(suffix):
+    """
+    Generate the public schema and write it the way ``generate_swagger``
+    does, replacing the file atomically so readers never see a partial one.
+    """
+    from drf_yasg.app_settings import swagger_settings
+    from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+    from config.openapi.info import api_info
+
+    fmt = FORMATS[suffix][0]
+    generator = swagger_settings.DEFAULT_GENERATOR_CLASS(info=api_info)
+    schema = generator.get_schema(request=None, public=True)
+    codec = OpenAPICodecJson(validators=[], pretty=True) if fmt == 'json' else OpenAPICodecYaml(validators=[])
+    path = schema_path(suffix)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as stream:
+        stream.write(codec.encode(schema))
+    os.replace(tmp, path)
+
+
+def _load(suffix):
+    path = schema_path(suffix)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        with _lock:
+            if not os.path.exists(path):
+                logger.warning("%s is missing; generating it now. Run generate_swagger at deploy instead.", path)
+                write_schema(suffix)
+        mtime = os.stat(path).st_mtime_ns
+    cached = _loaded.get(suffix)
+    if cached is None or cached[0] != mtime:
+        with open(path, 'rb') as stream:
+            body = stream.read()
+        cached = _loaded[suffix] = (mtime, body, quote_etag(hashlib.sha1(body).hexdigest()))
+    return cached[1], cached[2]
+
+
+@require_safe
+def schema_file(request, format):
+    """Serve the pre-generated schema with an ETag and a long ``Cache-Control``."""
+    if format not in FORMATS:
+        raise Http404
+    body, etag = _load(format)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(body, content_type=FORMATS[format][1])
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=settings.OPENAPI_SCHEMA_MAX_AGE)
+    return response
+
+
+def schema_ui(renderer):
+    """drf_yasg's ``with_ui(renderer)`` view, imported and built on the first request."""
+    view = None
+
+    def ui(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            from drf_yasg.views import get_schema_view
+            from config.openapi.info import api_info
+
+            view = get_schema_view(
+                api_info,
+                public=True,
+                permission_classes=[permissions.AllowAny],
+            ).with_ui(renderer, cache_timeout=0)
+        return view(request, *args, **kwargs)
+    return ui
@@ -10,6 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+import sys
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,11 +47,15 @@ INSTALLED_APPS = [
     'product',
     'rate',
     'user',
-    'drf_yasg',
+    'sync',
+    'benchmark',
+    'config.openapi.apps.OpenAPIConfig',
 ]
 
 MIDDLEWARE = [
+    'config.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'config.middleware.QueryInstrumentationMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -90,6 +97,44 @@ DATABASES = {
 }
 
 
+# Local memory by default; point CACHE_BACKEND / CACHE_LOCATION at a shared
+# backend (e.g. django.core.cache.backends.redis.RedisCache) when running
+# several workers so invalidations reach all of them.
+# "shared" holds state every worker must agree on (throttle buckets, OTPs,
+# cached users and their invalidations); with DEBUG off the app refuses to
+# start unless SHARED_CACHE_BACKEND is Redis or Memcached, whose incr is
+# atomic across processes.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'marketplace'),
+    },
+    'shared': {
+        'BACKEND': os.environ.get('SHARED_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('SHARED_CACHE_LOCATION', 'marketplace-shared'),
+    },
+}
+
+CATALOG_CACHE_ALIAS = 'default'
+CATALOG_CACHE_TIMEOUT = 60
+
+# Authenticated users are cached per token; saving a user invalidates them
+AUTH_CACHE_ALIAS = 'shared'
+AUTH_USER_CACHE_TIMEOUT = 60
+
+# Token buckets for the auth endpoints: "<n>/<period>" holds n tokens refilled evenly over the period
+THROTTLE_CACHE_ALIAS = 'shared'
+THROTTLE_RATES = {
+    'auth-ip': '30/min',
+    'auth-username': '5/min',
+    'auth-phone': '5/hour',
+    'otp-key': '5/min',
+}
+
+OTP_CACHE_ALIAS = 'shared'
+OTP_TTL_SECONDS = 60
+OTP_PURGE_BATCH_SIZE = 5000
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -111,8 +156,19 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'user.authentication.CachedJWTAuthentication',
+    ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'config.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'config.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ),
+    # Reverse proxies in front of the app; throttles trust only that many X-Forwarded-For hops
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
 }
 
 SWAGGER_SETTINGS = {
@@ -131,9 +187,57 @@ SWAGGER_SETTINGS = {
         },
     ],
     'LOGIN_URL': 'api/v1/auth/login',
-    "DEFAULT_MODEL_RENDERING": "example"
+    "DEFAULT_MODEL_RENDERING": "example",
+    'DEFAULT_INFO': 'config.openapi.info.api_info',
+    'DEFAULT_GENERATOR_CLASS': 'config.openapi.generators.LazySchemaGenerator',
+    'SPEC_URL': ('schema-json', {'format': '.json'}),
 }
 
+REDOC_SETTINGS = {
+    'SPEC_URL': ('schema-json', {'format': '.json'}),
+}
+
+# Written at deploy with `manage.py generate_swagger --overwrite schema/swagger.json`
+# (and swagger.yaml); generated once on first request if missing.
+OPENAPI_SCHEMA_DIR = BASE_DIR / 'schema'
+OPENAPI_SCHEMA_MAX_AGE = 24 * 60 * 60
+
+PAGINATION_DEFAULT_LIMIT = 50
+PAGINATION_MAX_LIMIT = 200
+
+# Seconds a stored Idempotency-Key response is replayed for
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+
+PRODUCT_IMPORT_CHUNK_SIZE = 2000
+PRODUCT_IMPORT_MAX_REPORTED_ERRORS = 1000
+PRODUCT_EXPORT_CHUNK_SIZE = 2000
+PRODUCT_BATCH_MAX_IDS = 300
+
+SYNC_DEFAULT_LIMIT = 500
+SYNC_MAX_LIMIT = 2000
+
+NEARBY_DEFAULT_RADIUS_KM = 5
+NEARBY_MAX_RADIUS_KM = 50
+
+# Share of requests whose SQL is timed and reported in Server-Timing / X-DB-* headers
+SQL_INSTRUMENTATION_SAMPLE_RATE = float(os.environ.get('SQL_INSTRUMENTATION_SAMPLE_RATE', '1.0' if DEBUG else '0.01'))
+SQL_INSTRUMENTATION_SLOWEST = 3
+SQL_INSTRUMENTATION_N_PLUS_ONE_THRESHOLD = 5
+
+# Shared by all workers on the host; each adds its histograms at most every METRICS_FLUSH_SECONDS.
+# Kept out of the project directory; `manage.py test` keeps its metrics in memory.
+METRICS_DB = os.environ.get('METRICS_DB', os.path.join(tempfile.gettempdir(), 'marketplace-metrics.sqlite3'))
+if sys.argv[1:2] == ['test']:
+    METRICS_DB = ':memory:'
+METRICS_FLUSH_SECONDS = 1.0
+# When set, /metrics requires "Authorization: Bearer <token>"; without it /metrics is open only when DEBUG is on
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+# Lists are ordered by a Bayesian average: RANKING_PRIOR_WEIGHT pseudo-ratings of RANKING_PRIOR_MEAN
+# are mixed into each item's ratings. Run `manage.py rebuild_ratings` after changing these.
+RANKING_PRIOR_WEIGHT = 10
+RANKING_PRIOR_MEAN = 3.0
+
 GRAPPELLI_ADMIN_TITLE = "My CRM Admin"
 GRAPPELLI_INDEX_DASHBOARD = 'app.dashboard.CustomIndexDashboard'
 GRAPPELLI_CUSTOM_CSS = 'grappelli/styles.css'
@@ -0,0 +1,47 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from .renderers import ORJSONRenderer
+
+
+class ORJSONRendererTest(SimpleTestCase):
+    def render(self, renderer, data):
+        return renderer.render(data, 'application/json', {})
+
+    def test_matches_stock_renderer(self):
+        data = {
+            'id': 1, 'name': "Sut 'Musaffo'", 'price': Decimal('12.50'), 'tags': ['a', 'b'],
+            'created_at': datetime(2026, 1, 2, 3, 4, 5, 123456, tzinfo=timezone.utc), 'market': None,
+        }
+        self.assertEqual(self.render(ORJSONRenderer(), data), self.render(JSONRenderer(), data))
+
+    def test_integers_past_64_bits_fall_back(self):
+        data = {'id': 2 ** 64, 'ids': [-(2 ** 70), 1]}
+        self.assertEqual(self.render(ORJSONRenderer(), data), self.render(JSONRenderer(), data))
+
+    def test_non_finite_floats_are_null(self):
+        self.assertEqual(self.render(ORJSONRenderer(), {'avg': float('nan')}), b'{"avg":null}')
+
+
+class MetricsEndpointTest(TestCase):
+    def test_tests_do_not_write_metrics_to_disk(self):
+        self.assertEqual(settings.METRICS_DB, ':memory:')
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_closed_without_token_unless_debug(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        with self.settings(DEBUG=True):
+            response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'# TYPE http_request_duration_seconds histogram', response.content)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret').status_code, 200)
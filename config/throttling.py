@@ -0,0 +1,109 @@
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+_PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+
+def parse_rate(rate):
+    """``'5/min'`` -> ``(5, 60)``: a bucket of 5 tokens refilled evenly over 60 seconds."""
+    capacity, period = rate.split('/')
+    return int(capacity), _PERIODS[period[0]]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket per ``scope`` and ``get_key()``, rated by
+    ``THROTTLE_RATES[scope]`` and kept in the THROTTLE_CACHE_ALIAS cache, so
+    it is shared by all workers when that cache is. Requests without a key,
+    or scopes without a rate, are not limited. DRF checks throttles before
+    the view runs and answers 429 with ``Retry-After`` from ``wait()``.
+
+    The bucket is only touched with atomic cache operations: ``add`` starts
+    it full at time ``started``, ``incr`` takes a token and ``decr`` gives it
+    back when the bucket turns out to be empty. Tokens refilled since
+    ``started`` are derived from the clock, and the entries expire the moment
+    the bucket would be full again, so the next request starts a new one.
+    """
+
+    scope = None
+
+    def get_key(self, request, view):
+        return self.get_ident(request)
+
+    def allow_request(self, request, view):
+        rate = settings.THROTTLE_RATES.get(self.scope)
+        value = self.get_key(request, view)
+        if rate is None or value is None:
+            return True
+        capacity, period = parse_rate(rate)
+        refill = capacity / period
+        key = f'throttle:{self.scope}:' + hashlib.sha1(str(value).encode()).hexdigest()
+
+        cache = caches[settings.THROTTLE_CACHE_ALIAS]
+        now = time.time()
+        started = now if cache.add(key, now, timeout=period) else cache.get(key, now)
+        taken_key = f'{key}:{started!r}'
+        cache.add(taken_key, 0, timeout=period)
+        try:
+            taken = cache.incr(taken_key)
+        except ValueError:
+            # expired between add and incr: the bucket was full again
+            cache.add(taken_key, 1, timeout=period)
+            taken = 1
+        level = taken - (now - started) * refill
+        if level > capacity:
+            try:
+                cache.decr(taken_key)
+            except ValueError:
+                pass
+            self.retry_after = (level - capacity) / refill
+            return False
+        # full again after `level / refill` seconds; whole seconds because memcached reads 0 as "never"
+        full_in = math.ceil(level / refill)
+        cache.touch(key, timeout=full_in)
+        cache.touch(taken_key, timeout=full_in + 1)
+        return True
+
+    def wait(self):
+        return self.retry_after
+
+
+class _DataThrottle(TokenBucketThrottle):
+    fields = ()
+
+    def normalize(self, value):
+        return value.strip().lower()
+
+    def get_key(self, request, view):
+        for field in self.fields:
+            value = request.data.get(field)
+            if isinstance(value, str) and value.strip():
+                return self.normalize(value)
+        return None
+
+
+class AuthIPThrottle(TokenBucketThrottle):
+    scope = 'auth-ip'
+
+
+class UsernameThrottle(_DataThrottle):
+    scope = 'auth-username'
+    fields = ('username',)
+
+
+class PhoneThrottle(_DataThrottle):
+    scope = 'auth-phone'
+    fields = ('phone', 'phone_number')
+
+    def normalize(self, value):
+        return ''.join(char for char in value if char.isdigit())
+
+
+class OTPKeyThrottle(_DataThrottle):
+    scope = 'otp-key'
+    fields = ('key',)
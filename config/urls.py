@@ -18,22 +18,8 @@ from django.contrib import admin
 from django.urls import path, include, re_path
 from django.conf.urls.static import static
 from django.conf import settings
-from drf_yasg.views import get_schema_view
-from rest_framework import permissions
-from drf_yasg import openapi
-
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Dommaster APIv1",
-        default_version="v1",
-        description="API for project Dommaster",
-        terms_of_service="",
-        contact=openapi.Contact(email="email@gmail.com"),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
-    permission_classes=[permissions.AllowAny],
-)
+from config.metrics import metrics
+from config.schema import schema_file, schema_ui
 
 urlpatterns = [
     path("grappelli/", include("grappelli.urls")), 
@@ -42,22 +28,24 @@ urlpatterns = [
     path("market/", include('market.urls')),
     path("product/", include("product.urls")),
     path("rate/", include("rate.urls")),
-    path("order/", include("order.urls"))
+    path("order/", include("order.urls")),
+    path("sync/", include("sync.urls")),
+    path("metrics", metrics, name="metrics"),
 ]
 
 urlpatterns += [
         re_path(
             r"^swagger(?P<format>\.json|\.yaml)$",
-            schema_view.without_ui(cache_timeout=0),
+            schema_file,
             name="schema-json",
         ),
         re_path(
             r"^swagger/$",
-            schema_view.with_ui("swagger", cache_timeout=0),
+            schema_ui("swagger"),
             name="schema-swagger-ui",
         ),
         re_path(
-            r"^redoc/$", schema_view.with_ui("redoc", cache_timeout=0), name="schema-redoc"
+            r"^redoc/$", schema_ui("redoc"), name="schema-redoc"
         )
     ]
 
@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def install_spatial_index(using, **kwargs):
+    from . import spatial
+    spatial.install(using)
 
 
 class MarketConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'market'
+
+    def ready(self):
+        post_migrate.connect(install_spatial_index, sender=self)
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0004_marketmodel_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='marketmodel',
+            index=models.Index(fields=['-rating_avg', '-rating_count'], name='market_rating_order_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 18:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0005_marketmodel_market_rating_order_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='marketmodel',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-18 18:36
+
+import config.ranking
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+# Frozen copy of config.ranking.bayesian_score as of this migration
+def bayesian_score(rating_sum, rating_count):
+    weight = float(settings.RANKING_PRIOR_WEIGHT)
+    return (weight * float(settings.RANKING_PRIOR_MEAN) + rating_sum) / (weight + rating_count)
+
+
+def fill_rank_score(apps, schema_editor):
+    MarketModel = apps.get_model('market', 'MarketModel')
+    MarketModel.objects.filter(rating_count__gt=0).update(rank_score=bayesian_score(F('rating_sum'), F('rating_count')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0007_marketmodel_coordinates'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='marketmodel',
+            name='market_rating_order_idx',
+        ),
+        migrations.AddField(
+            model_name='marketmodel',
+            name='rank_score',
+            field=models.FloatField(default=config.ranking.prior_score, editable=False),
+        ),
+        migrations.RunPython(fill_rank_score, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='marketmodel',
+            index=models.Index(fields=['-rank_score', '-id'], name='market_rank_order_idx'),
+        ),
+    ]
@@ -1,13 +1,34 @@
 from django.db import models
+from config.geo import parse_location
+from config.ranking import prior_score
 
 class MarketModel(models.Model):
     name = models.CharField(max_length=300)
     description = models.TextField()
     location = models.TextField()
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
+
+    rating_sum = models.FloatField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_avg = models.FloatField(default=0)
+    rank_score = models.FloatField(default=prior_score, editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-rank_score', '-id'], name='market_rank_order_idx'),
+            models.Index(fields=['latitude', 'longitude'], name='market_lat_lng_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.latitude, self.longitude = parse_location(self.location)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'location' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'latitude', 'longitude'}
+        super().save(*args, **kwargs)
@@ -1,13 +1,15 @@
 from rest_framework import serializers
+from config.fieldsets import SparseFieldsMixin
 from .models import MarketModel
 
-class MarketModelSerializer(serializers.ModelSerializer):
+class MarketModelSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     rate = serializers.SerializerMethodField()
     class Meta:
         model = MarketModel
-        fields = ['id', 'name', 'description', 'location', 'rate']
+        fields = ['id', 'name', 'description', 'location', 'latitude', 'longitude', 'rate']
+        column_map = {'rate': ['rating_avg', 'rating_count']}
         
     def get_rate(self, obj):
-        if getattr(obj, 'rate', None) is None:
+        if not obj.rating_count:
             return "Hali baxolanmagan"
-        return round(obj.rate, 1)
\ No newline at end of file
+        return round(obj.rating_avg, 1)
\ No newline at end of file
@@ -0,0 +1,73 @@
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models.expressions import RawSQL
+
+RTREE_TABLE = 'market_marketgeo'
+MARKET_TABLE = 'market_marketmodel'
+
+_CREATE_TABLE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {RTREE_TABLE} USING rtree(id, min_lat, max_lat, min_lng, max_lng)
+"""
+
+_POINT = "new.id, new.latitude, new.latitude, new.longitude, new.longitude"
+
+_TRIGGERS = {
+    f'{RTREE_TABLE}_ai': f"""
+    CREATE TRIGGER {RTREE_TABLE}_ai AFTER INSERT ON {MARKET_TABLE}
+    WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL BEGIN
+        INSERT INTO {RTREE_TABLE} VALUES ({_POINT});
+    END
+    """,
+    f'{RTREE_TABLE}_ad': f"""
+    CREATE TRIGGER {RTREE_TABLE}_ad AFTER DELETE ON {MARKET_TABLE} BEGIN
+        DELETE FROM {RTREE_TABLE} WHERE id = old.id;
+    END
+    """,
+    f'{RTREE_TABLE}_au': f"""
+    CREATE TRIGGER {RTREE_TABLE}_au AFTER UPDATE OF latitude, longitude ON {MARKET_TABLE} BEGIN
+        DELETE FROM {RTREE_TABLE} WHERE id = old.id;
+        INSERT INTO {RTREE_TABLE} SELECT {_POINT}
+        WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;
+    END
+    """,
+}
+
+
+def is_enabled(using=DEFAULT_DB_ALIAS):
+    return connections[using].vendor == 'sqlite'
+
+
+def install(using=DEFAULT_DB_ALIAS):
+    """
+    Create the R*Tree over market coordinates and the triggers that keep it
+    in sync. Safe to call repeatedly; triggers are recreated if a migration
+    rebuilt the market table.
+    """
+    connection = connections[using]
+    if not is_enabled(using) or MARKET_TABLE not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        created = RTREE_TABLE not in connection.introspection.table_names(cursor)
+        cursor.execute(_CREATE_TABLE)
+        for name, trigger in _TRIGGERS.items():
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute(trigger)
+        if created:
+            cursor.execute(
+                f"INSERT INTO {RTREE_TABLE} SELECT id, latitude, latitude, longitude, longitude FROM {MARKET_TABLE} "
+                "WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+            )
+
+
+def within_box(queryset, box):
+    """Markets of ``queryset`` inside ``(min_lat, max_lat, min_lng, max_lng)``."""
+    min_lat, max_lat, min_lng, max_lng = box
+    if is_enabled(queryset.db):
+        # R*Tree boxes are stored as 32-bit floats rounded outwards, so this may admit
+        # points just outside the box but never drops one inside it.
+        return queryset.filter(id__in=RawSQL(
+            f"SELECT id FROM {RTREE_TABLE} WHERE min_lat <= %s AND max_lat >= %s AND min_lng <= %s AND max_lng >= %s",
+            (max_lat, min_lat, max_lng, min_lng),
+        ))
+    return queryset.filter(
+        latitude__gte=min_lat, latitude__lte=max_lat, longitude__gte=min_lng, longitude__lte=max_lng
+    )
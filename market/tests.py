@@ -1,3 +1,77 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+from config.geo import parse_location
+from user.models import User, UserAddress
+from .models import MarketModel
 
-# Create your tests here.
+
+class ParseLocationTest(SimpleTestCase):
+    def test_coordinates(self):
+        for value in (
+            '41.311, 69.279', ' 41.311 ,69.279 ', '"41.311, 69.279"', '{"lat": 41.311, "lng": 69.279}',
+            '[41.311, 69.279]', {'latitude': '41.311', 'lon': '69.279'}, [41.311, 69.279],
+        ):
+            self.assertEqual(parse_location(value), (41.311, 69.279), value)
+
+    def test_addresses_are_not_coordinates(self):
+        for value in (
+            'Amir Temur 15, dom 3', 'Chilonzor 12-kvartal, 5-uy', '12, 5', 'Toshkent', '',
+            '41.3, 69.2, 7.0', '{"street": "Navoiy 1"}', None, 12,
+        ):
+            self.assertEqual(parse_location(value), (None, None), value)
+
+    def test_out_of_range(self):
+        for value in ('91.0, 10.0', '-90.5, 10.0', '10.0, 180.5', [10, -181]):
+            self.assertEqual(parse_location(value), (None, None), value)
+
+
+class NearbyMarketsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='buyer')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        # Amir Temur square, Tashkent
+        self.address = UserAddress.objects.create(
+            user=self.user, street='Amir Temur 1', location={'lat': 41.3111, 'lng': 69.2797}
+        )
+
+    def market(self, name, location):
+        return MarketModel.objects.create(name=name, description='', location=location)
+
+    def test_nearest_first_within_radius(self):
+        far = self.market('Far', '41.3500, 69.2797')      # ~4.3 km north
+        near = self.market('Near', '41.3200, 69.2797')    # ~1 km north
+        self.market('Samarkand', '39.6542, 66.9597')
+        street = self.market('Street address', 'Amir Temur 15, dom 3')
+        self.assertIsNone(street.latitude)
+
+        response = self.client.get('/market/nearby/', {'address': self.address.id, 'radius': 5})
+        self.assertEqual(response.status_code, 200)
+        markets = response.json()['markets']
+        self.assertEqual([market['id'] for market in markets], [near.id, far.id])
+        self.assertAlmostEqual(markets[0]['distance_km'], 0.99, places=1)
+
+        response = self.client.get('/market/nearby/', {'address': self.address.id, 'radius': 2})
+        self.assertEqual([market['id'] for market in response.json()['markets']], [near.id])
+
+    def test_limit_and_validation(self):
+        for i in range(3):
+            self.market(f'Market {i}', f'41.31{i + 2}, 69.2797')
+        response = self.client.get('/market/nearby/', {'address': self.address.id, 'limit': 2})
+        self.assertEqual(len(response.json()['markets']), 2)
+
+        for radius in ('0', '-1', '51', 'abc'):
+            response = self.client.get('/market/nearby/', {'address': self.address.id, 'radius': radius})
+            self.assertEqual(response.status_code, 400, radius)
+
+    def test_address_must_belong_to_user_and_have_coordinates(self):
+        other = UserAddress.objects.create(
+            user=User.objects.create(username='other'), street='Navoiy 1', location={'lat': 41.3, 'lng': 69.2}
+        )
+        response = self.client.get('/market/nearby/', {'address': other.id})
+        self.assertEqual(response.status_code, 404)
+
+        street = UserAddress.objects.create(user=self.user, street='Chilonzor', location='Chilonzor 12-kvartal, 5-uy')
+        self.assertIsNone(street.latitude)
+        response = self.client.get('/market/nearby/', {'address': street.id})
+        self.assertEqual(response.status_code, 400)
@@ -1,11 +1,33 @@
+import heapq
+
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 from .models import MarketModel
 from .serializers import MarketModelSerializer
-from django.db.models import Q, Avg
-from drf_yasg.utils import swagger_auto_schema
-from drf_yasg import openapi
+from django.conf import settings
+from django.db.models import Q
+from config.cache import cache_response, invalidate
+from config.conditional import conditional, queryset_state
+from config.fieldsets import sparse_params, sparse_queryset
+from config.geo import bounding_box, haversine_km
+from config.pagination import PaginationError, parse_limit
+from user.models import UserAddress
+from . import spatial
+from config.openapi import openapi, swagger_auto_schema
+
+def market_filters(params):
+    name = params.get('name')
+    filters = Q()
+    if name:
+        filters &= Q(name__icontains=name)
+    return filters
+
+def market_list_state(request):
+    return queryset_state(MarketModel.objects.filter(market_filters(request.GET)), versions=('market', 'rate'))
+
+def market_state(request, pk):
+    return queryset_state(MarketModel.objects.filter(id=pk))
 
 @swagger_auto_schema(
     methods=['POST'],
@@ -30,6 +52,7 @@ def create_market(request):
     if not serializer.is_valid():
         return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
     market = serializer.save()
+    invalidate('market')
     return Response({"new_market": MarketModelSerializer(market).data}, status=status.HTTP_201_CREATED)
 
 @swagger_auto_schema(
@@ -41,6 +64,13 @@ def create_market(request):
             description="Filter markets by name",
             type=openapi.TYPE_STRING,
             required=False
+        ),
+        openapi.Parameter(
+            'fields',
+            openapi.IN_QUERY,
+            description="Comma-separated fields to return",
+            type=openapi.TYPE_STRING,
+            required=False
         )
     ],
     responses={
@@ -51,16 +81,16 @@ def create_market(request):
     },
     operation_description="Get list of all markets with optional name filter"
 )
+@conditional(market_list_state)
+@cache_response('market', 'rate')
 @api_view(http_method_names=['GET'])
 def list_market(request):
-    name = request.query_params.get('name')
-    filters = Q()
-    if name:
-        filters &= Q(name__icontains=name)
-        
-    markets = MarketModel.objects.annotate(rate=Avg('rates__rate')).filter(filters) if filters else MarketModel.objects.annotate(rate=Avg("rates__rate"))
-    markets = markets.order_by('-rate')
-    serializer = MarketModelSerializer(markets, many=True)
+    fields, expand = sparse_params(request)
+    filters = market_filters(request.query_params)
+    markets = MarketModel.objects.filter(filters) if filters else MarketModel.objects.all()
+    markets = sparse_queryset(markets, MarketModelSerializer, fields, expand, required=('rating_avg', 'rating_count'))
+    markets = markets.order_by('-rank_score', '-id')
+    serializer = MarketModelSerializer(markets, many=True, fields=fields, expand=expand)
     return Response({"markets": serializer.data}, status=status.HTTP_200_OK)
 
 @swagger_auto_schema(
@@ -74,14 +104,89 @@ def list_market(request):
     },
     operation_description="Get detailed information about a specific market"
 )
+@conditional(market_state)
+@cache_response('market', 'rate')
 @api_view(http_method_names=['GET'])
 def market_detail(request, pk):
-    market = MarketModel.objects.annotate(rate=Avg('rates__rate')).get(id=pk)
-    if not market:
+    try:
+        market = MarketModel.objects.get(id=pk)
+    except MarketModel.DoesNotExist:
         return Response({"error": "Market not found"}, status=status.HTTP_404_NOT_FOUND)
     serializer = MarketModelSerializer(market)
     return Response({"market": serializer.data}, status=status.HTTP_200_OK)
 
+@swagger_auto_schema(
+    methods=['GET'],
+    manual_parameters=[
+        openapi.Parameter(
+            'address',
+            openapi.IN_QUERY,
+            description="ID of one of the user's addresses",
+            type=openapi.TYPE_INTEGER,
+            required=True
+        ),
+        openapi.Parameter(
+            'radius',
+            openapi.IN_QUERY,
+            description="Search radius in kilometres",
+            type=openapi.TYPE_NUMBER,
+            required=False
+        ),
+        openapi.Parameter(
+            'limit',
+            openapi.IN_QUERY,
+            description="Maximum number of markets",
+            type=openapi.TYPE_INTEGER,
+            required=False
+        )
+    ],
+    responses={
+        200: openapi.Response(
+            description="Markets within the radius, nearest first, with distance_km",
+            schema=MarketModelSerializer(many=True)
+        ),
+        400: "Bad Request",
+        401: "Unauthorized",
+        404: "Address not found"
+    },
+    operation_description="Get the markets nearest to one of the user's addresses"
+)
+@api_view(http_method_names=['GET'])
+def nearby_markets(request):
+    user = request.user
+    if not user.is_authenticated:
+        return Response({"error": "Avtorizatsiyadan o'ting"}, status=status.HTTP_401_UNAUTHORIZED)
+    try:
+        address = UserAddress.objects.get(id=request.query_params.get('address'), user=user)
+    except (UserAddress.DoesNotExist, ValueError, TypeError):
+        return Response({"error": "Manzil topilmadi"}, status=status.HTTP_404_NOT_FOUND)
+    if address.latitude is None:
+        return Response({"error": "Manzilda koordinatalar yo'q"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        radius = float(request.query_params.get('radius') or settings.NEARBY_DEFAULT_RADIUS_KM)
+        limit = parse_limit(request.query_params.get('limit'))
+    except (ValueError, PaginationError):
+        return Response({"error": "radius yoki limit noto'g'ri"}, status=status.HTTP_400_BAD_REQUEST)
+    if not 0 < radius <= settings.NEARBY_MAX_RADIUS_KM:
+        return Response(
+            {"error": f"radius 0 dan {settings.NEARBY_MAX_RADIUS_KM} km gacha bo'lishi kerak"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    box = bounding_box(address.latitude, address.longitude, radius)
+    candidates = spatial.within_box(MarketModel.objects.all(), box).values_list('id', 'latitude', 'longitude')
+    distances = []
+    for pk, latitude, longitude in candidates:
+        distance = haversine_km(address.latitude, address.longitude, latitude, longitude)
+        if distance <= radius:
+            distances.append((distance, pk))
+    nearest = heapq.nsmallest(limit, distances)
+
+    markets = MarketModel.objects.in_bulk([pk for _, pk in nearest])
+    serializer = MarketModelSerializer([markets[pk] for _, pk in nearest], many=True)
+    result = [dict(row, distance_km=round(distance, 3)) for row, (distance, _) in zip(serializer.data, nearest)]
+    return Response({"markets": result}, status=status.HTTP_200_OK)
+
 @swagger_auto_schema(
     methods=['PATCH'],
     request_body=MarketModelSerializer,
@@ -111,6 +216,7 @@ def update_market(request, pk):
         return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
     serializer.save()
     market.save()
+    invalidate('market')
     return Response({"message": "Market is updated", "market": serializer.data}, status=status.HTTP_200_OK)
 
 @swagger_auto_schema(
@@ -134,5 +240,6 @@ def delete_market(request, pk):
     if not market:
         return ({"error": "Market is wrong"}, status.HTTP_400_BAD_REQUEST)
     market.delete()
+    invalidate('market')
     return Response({"message": "Market is deleted",}, status=status.HTTP_200_OK)
     
\ No newline at end of file
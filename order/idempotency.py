@@ -0,0 +1,55 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from .models import IdempotencyKeyModel
+
+
+def request_fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(f"{request.method} {request.path} {body}".encode()).hexdigest()
+
+
+def replay(record, fingerprint):
+    if record.request_hash != fingerprint:
+        return Response(
+            {"error": "Idempotency-Key boshqa so'rov uchun ishlatilgan"},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    return Response(record.response, status=record.status_code, headers={"Idempotent-Replayed": "true"})
+
+
+def run_idempotent(request, key, handler):
+    """
+    Run ``handler(request)`` at most once per (user, key) within
+    IDEMPOTENCY_KEY_TTL seconds and replay its stored response afterwards.
+
+    The key row is claimed before the handler runs, in the same transaction,
+    so a concurrent duplicate blocks on the unique constraint until the first
+    request commits and then replays its response. Non-2xx responses are
+    rolled back together with the claim, so the client may retry them.
+    """
+    user = request.user
+    fingerprint = request_fingerprint(request)
+    expired = timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+    with transaction.atomic():
+        IdempotencyKeyModel.objects.filter(user=user, key=key, created_at__lt=expired).delete()
+        try:
+            with transaction.atomic():
+                record = IdempotencyKeyModel.objects.create(user=user, key=key, request_hash=fingerprint)
+        except IntegrityError:
+            return replay(IdempotencyKeyModel.objects.get(user=user, key=key), fingerprint)
+
+        response = handler(request)
+        if not status.is_success(response.status_code):
+            transaction.set_rollback(True)
+            return response
+        record.status_code = response.status_code
+        record.response = response.data
+        record.save(update_fields=['status_code', 'response'])
+    return response
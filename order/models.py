@@ -1,3 +1,4 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.conf import settings
 from product.models import ProductModel
@@ -13,6 +14,11 @@ class OrderModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='order_user_created_idx'),
+        ]
+
     def __str__(self):
         return self.product.name
 
@@ -27,3 +33,21 @@ class OrderItemModel(models.Model):
 
     def __str__(self):
         return self.product.name
+
+
+class IdempotencyKeyModel(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL,on_delete=models.CASCADE)
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response = models.JSONField(null=True,encoder=DjangoJSONEncoder)
+
+    created_at = models.DateTimeField(auto_now_add=True,db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='order_idempotency_user_key_unique'),
+        ]
+
+    def __str__(self):
+        return self.key
@@ -1,17 +1,19 @@
 from rest_framework import serializers
+from config.fieldsets import SparseFieldsMixin
 from .models import OrderModel, OrderItemModel
 from product.serializers import ProductModelSerializer
 from market.serializers import MarketModelSerializer
 from user.serializer import UserAddressSerializer
 
-class OrderItemModelSerializer(serializers.ModelSerializer):
+class OrderItemModelSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     product = ProductModelSerializer(read_only=True)
 
     class Meta:
         model = OrderItemModel
         fields = ['id', 'product', 'quantity', 'created_at']
+        expandable_fields = {'product': ProductModelSerializer}
 
-class OrderModelSerializer(serializers.ModelSerializer):
+class OrderModelSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     product = ProductModelSerializer(read_only=True)
     market = MarketModelSerializer(read_only=True)
     user_address = UserAddressSerializer(read_only=True)
@@ -20,7 +22,12 @@ class OrderModelSerializer(serializers.ModelSerializer):
     class Meta:
         model = OrderModel
         fields = ['id', 'product', 'user', 'market', 'user_address', 'created_at', 'order_items']
+        expandable_fields = {
+            'product': ProductModelSerializer,
+            'market': MarketModelSerializer,
+            'user_address': UserAddressSerializer,
+        }
 
     def get_order_items(self, obj):
         items = obj.orderitemmodel_set.all()
-        return OrderItemModelSerializer(items, many=True).data
+        return OrderItemModelSerializer(items, many=True, expand=self.expand).data
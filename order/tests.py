@@ -1,3 +1,171 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from market.models import MarketModel
+from product.models import ProductModel
+from user.models import User, UserAddress
+from .models import IdempotencyKeyModel, OrderModel, OrderItemModel
+
+
+class OrderQueryBudgetTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='buyer')
+        self.address = UserAddress.objects.create(user=self.user, street='Amir Temur 1', location={})
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_orders(self, count):
+        for i in range(count):
+            market = MarketModel.objects.create(name=f'Market {i}', description='', location='')
+            product = ProductModel.objects.create(
+                market=market, name=f'Product {i}', description='', category='', price=100, discount=0
+            )
+            order = OrderModel.objects.create(
+                product=product, user=self.user, market=market, user_address=self.address
+            )
+            for _ in range(3):
+                OrderItemModel.objects.create(order=order, product=product, quantity=1)
+        return order
+
+    def test_list_orders_query_count_is_constant(self):
+        self.create_orders(2)
+        with self.assertNumQueries(3):
+            response = self.client.get('/order/orders/')
+        self.assertEqual(len(response.json()['orders']), 2)
+
+        self.create_orders(20)
+        with self.assertNumQueries(3):
+            response = self.client.get('/order/orders/')
+        self.assertEqual(len(response.json()['orders']), 22)
+
+    def test_order_detail_query_count(self):
+        order = self.create_orders(1)
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/order/{order.id}/')
+        self.assertEqual(len(response.json()['order']['order_items']), 3)
+
+    def test_order_detail_not_modified(self):
+        order = self.create_orders(1)
+        response = self.client.get(f'/order/{order.id}/')
+        etag = response['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/order/{order.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        item = order.orderitemmodel_set.first()
+        item.quantity = 5
+        item.save()
+        response = self.client.get(f'/order/{order.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class OrderIdempotencyTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='buyer')
+        self.address = UserAddress.objects.create(user=self.user, street='Amir Temur 1', location={})
+        self.market = MarketModel.objects.create(name='Market', description='', location='')
+        self.product = ProductModel.objects.create(
+            market=self.market, name='Product', description='', category='', price=100, discount=0
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_order(self, key, quantity=1, product=None):
+        data = {
+            'market': self.market.id,
+            'user_address': self.address.id,
+            'items': [{'product': product or self.product.id, 'quantity': quantity}],
+        }
+        return self.client.post('/order/create/', data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_replay_returns_the_stored_response(self):
+        first = self.create_order('order-1')
+        self.assertEqual(first.status_code, 201)
+        second = self.create_order('order-1')
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(OrderModel.objects.count(), 1)
+
+    def test_key_reused_for_another_request(self):
+        self.create_order('order-1')
+        response = self.create_order('order-1', quantity=2)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(OrderModel.objects.count(), 1)
+
+    def test_failed_request_can_be_retried(self):
+        response = self.create_order('order-1', product=self.product.id + 100)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(IdempotencyKeyModel.objects.exists())
+
+        response = self.create_order('order-1')
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', response)
+
+    def test_expired_key_runs_again(self):
+        self.create_order('order-1')
+        IdempotencyKeyModel.objects.update(created_at=timezone.now() - timedelta(days=2))
+        response = self.create_order('order-1')
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(OrderModel.objects.count(), 2)
+        self.assertEqual(IdempotencyKeyModel.objects.count(), 1)
+
+
+class OrderCreateTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='buyer')
+        self.address = UserAddress.objects.create(user=self.user, street='Amir Temur 1', location={})
+        self.market = MarketModel.objects.create(name='Market', description='', location='')
+        self.products = [
+            ProductModel.objects.create(
+                market=self.market, name=f'Product {i}', description='', category='', price=100, discount=0
+            )
+            for i in range(3)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_order(self, items, **data):
+        data = {'market': self.market.id, 'user_address': self.address.id, 'items': items, **data}
+        return self.client.post('/order/create/', data, format='json')
+
+    def test_cart_with_several_items(self):
+        items = [{'product': product.id, 'quantity': i + 1} for i, product in enumerate(self.products)]
+        # validation, savepoint, order, bulk items, release, and the two reads for the response
+        with self.assertNumQueries(7):
+            response = self.create_order(items)
+        self.assertEqual(response.status_code, 201)
+        order = OrderModel.objects.get()
+        self.assertEqual(
+            sorted(order.orderitemmodel_set.values_list('product_id', 'quantity')),
+            [(product.id, i + 1) for i, product in enumerate(self.products)],
+        )
+        self.assertEqual(len(response.json()['new_order']['order_items']), 3)
+
+    def test_unknown_market_and_foreign_address(self):
+        items = [{'product': self.products[0].id}]
+        response = self.create_order(items, market=self.market.id + 100)
+        self.assertEqual(response.status_code, 400)
+
+        other = UserAddress.objects.create(user=User.objects.create(username='other'), street='Navoiy 1', location={})
+        response = self.create_order(items, user_address=other.id)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(OrderModel.objects.exists())
 
-# Create your tests here.
+    def test_ids_out_of_range(self):
+        huge = 2 ** 63
+        for items, data in (
+            ([{'product': huge}], {}),
+            ([{'product': -1}], {}),
+            ([{'product': self.products[0].id, 'quantity': huge}], {}),
+            ([{'product': self.products[0].id}], {'market': huge}),
+            ([{'product': self.products[0].id}], {'user_address': str(huge)}),
+            ([{'product': self.products[0].id}], {'market': 'abc'}),
+        ):
+            response = self.create_order(items, **data)
+            self.assertEqual(response.status_code, 400, (items, data))
+        self.assertFalse(OrderModel.objects.exists())
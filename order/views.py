@@ -3,19 +3,82 @@ from rest_framework.response import Response
 from rest_framework import status
 from .models import OrderModel, OrderItemModel
 from .serializers import OrderModelSerializer, OrderItemModelSerializer
-from drf_yasg.utils import swagger_auto_schema
-from drf_yasg import openapi
+from .idempotency import run_idempotent
+from market.models import MarketModel
+from product.models import ProductModel
+from user.models import UserAddress
+from django.db import transaction
+from django.db.models import Exists, Prefetch
+from config.conditional import conditional, queryset_state
+from config.fieldsets import sparse_params, sparse_queryset
+from config.openapi import openapi, swagger_auto_schema
+
+def order_queryset(fields=None, expand=None):
+    orders = sparse_queryset(OrderModel.objects.all(), OrderModelSerializer, fields, expand)
+    if fields is None or 'order_items' in fields:
+        items = sparse_queryset(OrderItemModel.objects.all(), OrderItemModelSerializer, None, expand, required=('order',))
+        orders = orders.prefetch_related(Prefetch('orderitemmodel_set', queryset=items))
+    return orders
+
+ORDER_RELATIONS = (
+    'product', 'market', 'user_address',
+    'orderitemmodel', 'orderitemmodel__product', 'orderitemmodel__product__market',
+)
+
+def order_state(request, pk=None):
+    if not request.user.is_authenticated:
+        return None, None
+    orders = OrderModel.objects.filter(user=request.user)
+    if pk is not None:
+        orders = orders.filter(id=pk)
+    return queryset_state(orders, ORDER_RELATIONS, counts=('orderitemmodel',))
+
+def parse_order_items(data):
+    items = data.get('items')
+    if items is None:
+        if not data.get('product'):
+            return []
+        items = [{'product': data.get('product'), 'quantity': data.get('quantity', 1)}]
+    if not isinstance(items, list):
+        raise ValueError("items ro'yxat bo'lishi kerak")
+    parsed = []
+    for item in items:
+        if not isinstance(item, dict):
+            raise ValueError("items elementi object bo'lishi kerak")
+        try:
+            product_id = int(item.get('product'))
+            quantity = int(item.get('quantity') or 1)
+        except (TypeError, ValueError):
+            raise ValueError("product va quantity butun son bo'lishi kerak")
+        if not 0 < product_id < 2 ** 63:
+            raise ValueError("product ID noto'g'ri")
+        if not 0 < quantity < 2 ** 31:
+            raise ValueError("quantity musbat bo'lishi kerak")
+        parsed.append((product_id, quantity))
+    return parsed
 
 @swagger_auto_schema(
     methods=['POST'],
     request_body=openapi.Schema(
         type=openapi.TYPE_OBJECT,
-        required=['product', 'market', 'user_address'],
+        required=['items', 'market', 'user_address'],
         properties={
-            'product': openapi.Schema(type=openapi.TYPE_INTEGER, description='Product ID'),
+            'items': openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                description='Order items',
+                items=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    required=['product'],
+                    properties={
+                        'product': openapi.Schema(type=openapi.TYPE_INTEGER, description='Product ID'),
+                        'quantity': openapi.Schema(type=openapi.TYPE_INTEGER, description='Quantity of product', default=1)
+                    }
+                )
+            ),
             'market': openapi.Schema(type=openapi.TYPE_INTEGER, description='Market ID'),
             'user_address': openapi.Schema(type=openapi.TYPE_INTEGER, description='User Address ID'),
-            'quantity': openapi.Schema(type=openapi.TYPE_INTEGER, description='Quantity of product', default=1)
+            'product': openapi.Schema(type=openapi.TYPE_INTEGER, description='Single product ID (legacy, use items)'),
+            'quantity': openapi.Schema(type=openapi.TYPE_INTEGER, description='Quantity for the single product (legacy)', default=1)
         }
     ),
     responses={
@@ -26,7 +89,16 @@ from drf_yasg import openapi
         400: "Bad Request",
         401: "Unauthorized"
     },
-    operation_description="Create a new order"
+    manual_parameters=[
+        openapi.Parameter(
+            'Idempotency-Key',
+            openapi.IN_HEADER,
+            description="Client-generated key; retries with the same key replay the first response",
+            type=openapi.TYPE_STRING,
+            required=False
+        )
+    ],
+    operation_description="Create a new order with one or more items in a single transaction"
 )
 @api_view(['POST'])
 def create_order(request):
@@ -34,29 +106,59 @@ def create_order(request):
     if not user.is_authenticated:
         return Response({"error": "Avtorizatsiyadan o'ting"}, status=status.HTTP_401_UNAUTHORIZED)
 
-    product_id = request.data.get('product')
+    key = request.headers.get('Idempotency-Key')
+    if key:
+        if len(key) > 255:
+            return Response({"error": "Idempotency-Key juda uzun"}, status=status.HTTP_400_BAD_REQUEST)
+        return run_idempotent(request, key, _create_order)
+    return _create_order(request)
+
+def _create_order(request):
+    user = request.user
     market_id = request.data.get('market')
     user_address_id = request.data.get('user_address')
-    quantity = request.data.get('quantity', 1)
+    try:
+        items = parse_order_items(request.data)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-    if not all([product_id, market_id, user_address_id]):
-        return Response({"error": "product, market, user_address kerak"}, status=status.HTTP_400_BAD_REQUEST)
+    if not all([items, market_id, user_address_id]):
+        return Response({"error": "items, market, user_address kerak"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        market_id, user_address_id = int(market_id), int(user_address_id)
+    except (TypeError, ValueError):
+        return Response({"error": "market va user_address butun son bo'lishi kerak"}, status=status.HTTP_400_BAD_REQUEST)
+    if not (0 < market_id < 2 ** 63 and 0 < user_address_id < 2 ** 63):
+        return Response({"error": "market yoki user_address noto'g'ri"}, status=status.HTTP_400_BAD_REQUEST)
 
-    order = OrderModel.objects.create(
-            product_id=product_id,
-            user=user,
-            market_id=market_id,
-            user_address_id=user_address_id
-    ) 
-    if not order:
-        return Response({"error": {"Invalid credentials"}}, status=status.HTTP_400_BAD_REQUEST)
-    
-    OrderItemModel.objects.create(
-            order=order,
-            product_id=product_id,
-            quantity=quantity
-    )
-    serializer = OrderModelSerializer(order)
+    # products, market and the caller's address are checked in one query
+    product_ids = {product_id for product_id, _ in items}
+    rows = ProductModel.objects.filter(id__in=product_ids).annotate(
+        market_found=Exists(MarketModel.objects.filter(id=market_id)),
+        address_owned=Exists(UserAddress.objects.filter(id=user_address_id, user=user)),
+    ).values_list('id', 'market_found', 'address_owned')
+    found = {pk: (market_found, address_owned) for pk, market_found, address_owned in rows}
+    missing = sorted(product_ids - set(found))
+    if missing:
+        return Response({"error": "Product topilmadi", "missing": missing}, status=status.HTTP_400_BAD_REQUEST)
+    market_found, address_owned = next(iter(found.values()))
+    if not market_found:
+        return Response({"error": "Market topilmadi"}, status=status.HTTP_400_BAD_REQUEST)
+    if not address_owned:
+        return Response({"error": "Manzil topilmadi"}, status=status.HTTP_400_BAD_REQUEST)
+
+    with transaction.atomic():
+        order = OrderModel.objects.create(
+                product_id=items[0][0],
+                user=user,
+                market_id=market_id,
+                user_address_id=user_address_id
+        )
+        OrderItemModel.objects.bulk_create([
+            OrderItemModel(order=order, product_id=product_id, quantity=quantity)
+            for product_id, quantity in items
+        ])
+    serializer = OrderModelSerializer(order_queryset().get(id=order.id))
     return Response({"new_order": serializer.data}, status=status.HTTP_201_CREATED)
 
 @swagger_auto_schema(
@@ -68,16 +170,34 @@ def create_order(request):
         ),
         401: "Unauthorized"
     },
+    manual_parameters=[
+        openapi.Parameter(
+            'fields',
+            openapi.IN_QUERY,
+            description="Comma-separated fields to return",
+            type=openapi.TYPE_STRING,
+            required=False
+        ),
+        openapi.Parameter(
+            'expand',
+            openapi.IN_QUERY,
+            description="Comma-separated relations to nest: product, market, user_address",
+            type=openapi.TYPE_STRING,
+            required=False
+        )
+    ],
     operation_description="Get list of all orders for the authenticated user"
 )
 @api_view(['GET'])
+@conditional(order_state)
 def list_orders(request):
     user = request.user
     if not user.is_authenticated:
         return Response({"error": "Avtorizatsiyadan o'ting"}, status=status.HTTP_401_UNAUTHORIZED)
 
-    orders = OrderModel.objects.filter(user=user).order_by('-created_at')
-    serializer = OrderModelSerializer(orders, many=True)
+    fields, expand = sparse_params(request)
+    orders = order_queryset(fields, expand).filter(user=user).order_by('-created_at')
+    serializer = OrderModelSerializer(orders, many=True, fields=fields, expand=expand)
     return Response({"orders": serializer.data}, status=status.HTTP_200_OK)
 
 @swagger_auto_schema(
@@ -93,13 +213,15 @@ def list_orders(request):
     operation_description="Get detailed information about a specific order"
 )
 @api_view(['GET'])
+@conditional(order_state)
 def order_detail(request, pk):
     user = request.user
     if not user.is_authenticated:
         return Response({"error": "Avtorizatsiyadan o'ting"}, status=status.HTTP_401_UNAUTHORIZED)
 
-    order = OrderModel.objects.get(id=pk, user=user)
-    if not order:
+    try:
+        order = order_queryset().get(id=pk, user=user)
+    except OrderModel.DoesNotExist:
         return Response({"error": "Order topilmadi"}, status=status.HTTP_404_NOT_FOUND)
 
     serializer = OrderModelSerializer(order)
@@ -146,7 +268,7 @@ def update_order(request, pk):
     if user_address_id:
         order.user_address_id = user_address_id
     order.save()
-    serializer = OrderModelSerializer(order)
+    serializer = OrderModelSerializer(order_queryset().get(id=order.id))
     return Response({"message": "Order updated", "order": serializer.data}, status=status.HTTP_200_OK)
 
 @swagger_auto_schema(
@@ -197,7 +319,7 @@ def update_order_item(request, pk):
     if not user.is_authenticated:
         return Response({"error": "Avtorizatsiyadan o'ting"}, status=status.HTTP_401_UNAUTHORIZED)
 
-    order_item = OrderItemModel.objects.get(id=pk, order__user=user)
+    order_item = OrderItemModel.objects.select_related('product__market').get(id=pk, order__user=user)
     if not order_item:
         return Response({"error": "Order Item topilmadi"}, status=status.HTTP_404_NOT_FOUND)
 
@@ -0,0 +1,56 @@
+import csv
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+COLUMNS = ['id', 'sku', 'name', 'description', 'category', 'price', 'discount', 'market', 'available', 'rating_avg', 'rating_count']
+_SOURCES = ['market_id' if column == 'market' else column for column in COLUMNS]
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to the csv writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def _rows(queryset, chunk_size):
+    return queryset.order_by('id').values_list(*_SOURCES).iterator(chunk_size=chunk_size)
+
+
+def _batched(lines, chunk_size):
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= chunk_size:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
+
+
+def iter_ndjson(queryset, chunk_size):
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    for row in _rows(queryset, chunk_size):
+        yield encoder.encode(dict(zip(COLUMNS, row))) + '\n'
+
+
+def iter_csv(queryset, chunk_size):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(COLUMNS)
+    for row in _rows(queryset, chunk_size):
+        yield writer.writerow(row)
+
+
+def export_products(queryset, fmt, chunk_size=None):
+    """
+    Yield the catalog as NDJSON or CSV text, ``chunk_size`` rows per piece.
+    Rows are read with a chunked iterator and never held in memory together.
+    """
+    chunk_size = chunk_size or settings.PRODUCT_EXPORT_CHUNK_SIZE
+    lines = iter_csv(queryset, chunk_size) if fmt == 'csv' else iter_ndjson(queryset, chunk_size)
+    return _batched(lines, chunk_size)
@@ -0,0 +1,198 @@
+import codecs
+import csv
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from config.ranking import prior_score
+from sync import changes
+from . import search
+from .models import ProductModel
+
+FORMATS = ('csv', 'jsonl')
+INSERT_FIELDS = ['name', 'description', 'category', 'category_normalized', 'price', 'discount', 'available']
+UPDATE_COLUMNS = [*INSERT_FIELDS, 'updated_at']
+_TRUE = ('1', 'true', 'yes', 'y')
+_FALSE = ('0', 'false', 'no', 'n', '')
+INVALID_ENCODING = "Row is not valid UTF-8"
+# largest value the 64-bit INTEGER columns accept
+MAX_INTEGER = 2 ** 63 - 1
+
+
+def detect_format(filename):
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return None
+
+
+def _decode_lines(stream, invalid):
+    """Text lines of a binary stream; numbers of lines that are not UTF-8 are added to ``invalid``."""
+    for number, line in enumerate(stream, 1):
+        if number == 1 and line.startswith(codecs.BOM_UTF8):
+            line = line[len(codecs.BOM_UTF8):]
+        try:
+            yield line.decode('utf-8')
+        except UnicodeDecodeError:
+            invalid.add(number)
+            yield line.decode('utf-8', 'replace')
+
+
+def read_rows(stream, fmt):
+    """Yield ``(row_number, row, error)`` from a binary stream, one line at a time."""
+    invalid = set()
+    lines = _decode_lines(stream, invalid)
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        first = 1
+        for row in reader:
+            # a quoted value may span several lines
+            if invalid.intersection(range(first, reader.line_num + 1)):
+                yield reader.line_num, None, INVALID_ENCODING
+            else:
+                yield reader.line_num, row, None
+            first = reader.line_num + 1
+        return
+    for number, line in enumerate(lines, 1):
+        if number in invalid:
+            yield number, None, INVALID_ENCODING
+            continue
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield number, None, "Invalid JSON"
+            continue
+        if not isinstance(row, dict):
+            yield number, None, "Row must be a JSON object"
+            continue
+        yield number, row, None
+
+
+def _text(row, field, errors, required=True, max_length=None):
+    value = row.get(field)
+    value = '' if value is None else str(value).strip()
+    if required and not value:
+        errors[field] = "This field is required."
+    elif max_length and len(value) > max_length:
+        errors[field] = f"Ensure this field has no more than {max_length} characters."
+    return value
+
+
+def _integer(row, field, errors, default=None):
+    value = row.get(field)
+    if value in (None, ''):
+        if default is None:
+            errors[field] = "This field is required."
+        return default
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        errors[field] = "A valid integer is required."
+        return None
+    if value < 0:
+        errors[field] = "Ensure this value is greater than or equal to 0."
+    elif value > MAX_INTEGER:
+        errors[field] = f"Ensure this value is less than or equal to {MAX_INTEGER}."
+        return None
+    return value
+
+
+def _boolean(row, field, errors):
+    value = row.get(field)
+    if isinstance(value, bool):
+        return value
+    value = '' if value is None else str(value).strip().lower()
+    if value in _TRUE:
+        return True
+    if value not in _FALSE:
+        errors[field] = "Must be a valid boolean."
+    return False
+
+
+def clean_row(row):
+    errors = {}
+    values = {
+        'sku': _text(row, 'sku', errors, max_length=100),
+        'name': _text(row, 'name', errors, max_length=300),
+        'description': _text(row, 'description', errors, required=False),
+        'category': _text(row, 'category', errors, max_length=300),
+        'price': _integer(row, 'price', errors),
+        'discount': _integer(row, 'discount', errors, default=0),
+        'available': _boolean(row, 'available', errors),
+    }
+    values['category_normalized'] = values['category'].lower()
+    return values, errors
+
+
+def _upsert_sql(connection):
+    table = connection.ops.quote_name(ProductModel._meta.db_table)
+    columns = [
+        'market_id', 'sku', *INSERT_FIELDS, 'rating_sum', 'rating_count', 'rating_avg', 'rank_score',
+        'created_at', 'updated_at',
+    ]
+    updates = ', '.join(f'{name} = excluded.{name}' for name in map(connection.ops.quote_name, UPDATE_COLUMNS))
+    return (
+        f"INSERT INTO {table} ({', '.join(map(connection.ops.quote_name, columns))}) "
+        f"VALUES ({', '.join(['%s'] * len(columns))}) "
+        f"ON CONFLICT (market_id, sku) DO UPDATE SET {updates}"
+    )
+
+
+def _write_chunk(market, products):
+    """
+    One prepared INSERT ... ON CONFLICT DO UPDATE executed for the whole
+    chunk; bulk_create would recompile the statement every ~70 rows on SQLite.
+    The search index is synced once per chunk rather than per row.
+    """
+    skus = list(products)
+    rows = ProductModel.objects.filter(market=market, sku__in=skus)
+    existing = set(rows.values_list('sku', flat=True))
+    connection = connections[ProductModel.objects.db]
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    unrated = prior_score()
+    params = [
+        (market.id, sku, *(values[name] for name in INSERT_FIELDS), 0.0, 0, 0.0, unrated, now, now)
+        for sku, values in products.items()
+    ]
+    with search.deferred_sync(rows), connection.cursor() as cursor:
+        cursor.executemany(_upsert_sql(connection), params)
+    changes.record_queryset(rows)
+    return len(skus) - len(existing), len(existing)
+
+
+def import_products(stream, market, fmt, chunk_size=None):
+    """
+    Upsert products of ``market`` keyed on ``sku`` from a CSV or JSONL
+    stream. Rows are validated and written ``chunk_size`` at a time, each
+    chunk in one transaction; invalid rows are skipped and reported.
+    """
+    chunk_size = chunk_size or settings.PRODUCT_IMPORT_CHUNK_SIZE
+    report = {"created": 0, "updated": 0, "error_count": 0, "errors": []}
+    rows = read_rows(stream, fmt)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        products = {}
+        for number, row, error in chunk:
+            errors = {"row": error} if error else None
+            if row is not None:
+                values, errors = clean_row(row)
+            if errors:
+                report["error_count"] += 1
+                if len(report["errors"]) < settings.PRODUCT_IMPORT_MAX_REPORTED_ERRORS:
+                    report["errors"].append({"row": number, "errors": errors})
+                continue
+            products[values['sku']] = values
+        if products:
+            with transaction.atomic():
+                created, updated = _write_chunk(market, products)
+            report["created"] += created
+            report["updated"] += updated
+    return report
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Sum
+from market.models import MarketModel
+from order.models import OrderModel
+from product.models import ProductModel
+from rate.models import RateModel
+
+
+class Command(BaseCommand):
+    help = "Print the query plans of the hot catalog, order and rating queries"
+
+    def queries(self):
+        product = ProductModel.objects.order_by('id').first()
+        market_id = product.market_id if product else 1
+        order = OrderModel.objects.order_by('id').first()
+        user_id = order.user_id if order else 1
+        ordering = ('-rank_score', '-id')
+        return {
+            'products by category': ProductModel.objects.filter(category_normalized='phones').order_by(*ordering)[:50],
+            'products by market, available, price range': ProductModel.objects.filter(
+                market_id=market_id, available__in=[True], price__gte=1000, price__lte=50000
+            ).order_by(*ordering)[:50],
+            'orders of a user': OrderModel.objects.filter(user_id=user_id).order_by('-created_at'),
+            'rates of a product': RateModel.objects.filter(product_id=product.id if product else 1),
+            'rating totals per product': RateModel.objects.filter(product__isnull=False).values('product').annotate(
+                total=Sum('rate'), count=Count('id')
+            ).order_by(),
+            'rating totals per market': RateModel.objects.filter(market__isnull=False).values('market').annotate(
+                total=Sum('rate'), count=Count('id')
+            ).order_by(),
+            'markets by rank': MarketModel.objects.order_by('-rank_score', '-id')[:50],
+        }
+
+    def handle(self, *args, **options):
+        for title, queryset in self.queries().items():
+            self.stdout.write(self.style.MIGRATE_HEADING(title))
+            self.stdout.write(queryset.explain())
+            self.stdout.write('')
@@ -0,0 +1,29 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from config.cache import invalidate
+from market.models import MarketModel
+from product.importer import FORMATS, detect_format, import_products
+
+
+class Command(BaseCommand):
+    help = "Bulk upsert a market's products from a CSV or JSONL file, keyed on sku"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--market', type=int, required=True)
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--chunk-size', type=int)
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or detect_format(options['path'])
+        if not fmt:
+            raise CommandError("Cannot detect the file format, pass --format")
+        try:
+            market = MarketModel.objects.get(id=options['market'])
+        except MarketModel.DoesNotExist:
+            raise CommandError("Market not found")
+        with open(options['path'], 'rb') as stream:
+            report = import_products(stream, market, fmt, chunk_size=options['chunk_size'])
+        invalidate('product')
+        self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-18 17:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0002_remove_productmodel_picture'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productmodel',
+            name='rating_avg',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='productmodel',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='productmodel',
+            name='rating_sum',
+            field=models.FloatField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 17:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0004_marketmodel_rating_aggregates'),
+        ('product', '0003_productmodel_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productmodel',
+            index=models.Index(fields=['-rating_avg', '-rating_count', '-id'], name='product_rating_order_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-18 18:02
+
+from django.db import migrations, models
+
+
+def normalize_categories(apps, schema_editor):
+    ProductModel = apps.get_model('product', 'ProductModel')
+    batch = []
+    for product in ProductModel.objects.only('id', 'category').iterator(chunk_size=2000):
+        product.category_normalized = product.category.lower()
+        batch.append(product)
+        if len(batch) >= 2000:
+            ProductModel.objects.bulk_update(batch, ['category_normalized'])
+            batch = []
+    ProductModel.objects.bulk_update(batch, ['category_normalized'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0005_marketmodel_market_rating_order_idx'),
+        ('product', '0004_productmodel_rating_order_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productmodel',
+            name='category_normalized',
+            field=models.CharField(default='', editable=False, max_length=300),
+        ),
+        migrations.RunPython(normalize_categories, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='productmodel',
+            index=models.Index(fields=['category_normalized', '-rating_avg', '-rating_count', '-id'], name='product_category_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productmodel',
+            index=models.Index(fields=['market', 'available', 'price'], name='product_market_avail_price_idx'),
+        ),
+    ]
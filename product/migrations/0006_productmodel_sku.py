@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 18:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0005_marketmodel_market_rating_order_idx'),
+        ('product', '0005_productmodel_category_normalized_and_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productmodel',
+            name='sku',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='productmodel',
+            constraint=models.UniqueConstraint(fields=('market', 'sku'), name='product_market_sku_unique'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 18:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0006_productmodel_sku'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='productmodel',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
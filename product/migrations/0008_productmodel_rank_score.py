@@ -0,0 +1,50 @@
+# Generated by Django 5.2 on 2026-10-18 18:36
+
+import config.ranking
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+# Frozen copy of config.ranking.bayesian_score as of this migration
+def bayesian_score(rating_sum, rating_count):
+    weight = float(settings.RANKING_PRIOR_WEIGHT)
+    return (weight * float(settings.RANKING_PRIOR_MEAN) + rating_sum) / (weight + rating_count)
+
+
+def fill_rank_score(apps, schema_editor):
+    ProductModel = apps.get_model('product', 'ProductModel')
+    ProductModel.objects.filter(rating_count__gt=0).update(rank_score=bayesian_score(F('rating_sum'), F('rating_count')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0008_marketmodel_rank_score'),
+        ('product', '0007_alter_productmodel_updated_at'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='productmodel',
+            name='product_rating_order_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='productmodel',
+            name='product_category_rating_idx',
+        ),
+        migrations.AddField(
+            model_name='productmodel',
+            name='rank_score',
+            field=models.FloatField(default=config.ranking.prior_score, editable=False),
+        ),
+        migrations.RunPython(fill_rank_score, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='productmodel',
+            index=models.Index(fields=['-rank_score', '-id'], name='product_rank_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productmodel',
+            index=models.Index(fields=['category_normalized', '-rank_score', '-id'], name='product_category_rank_idx'),
+        ),
+    ]
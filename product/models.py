@@ -1,18 +1,43 @@
 from django.db import models
+from config.ranking import prior_score
 from market.models import MarketModel
 
 class ProductModel(models.Model):
     market = models.ForeignKey(MarketModel,on_delete=models.CASCADE,related_name="product")
+    sku = models.CharField(max_length=100, null=True, blank=True)
     name = models.CharField(max_length=300)
     description = models.TextField()
     category = models.CharField(max_length=300)
+    category_normalized = models.CharField(max_length=300, default='', editable=False)
     price = models.PositiveIntegerField()
     discount = models.PositiveIntegerField()
     available = models.BooleanField(default=False)
 
+    rating_sum = models.FloatField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_avg = models.FloatField(default=0)
+    rank_score = models.FloatField(default=prior_score, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-rank_score', '-id'], name='product_rank_order_idx'),
+            models.Index(fields=['category_normalized', '-rank_score', '-id'], name='product_category_rank_idx'),
+            models.Index(fields=['market', 'available', 'price'], name='product_market_avail_price_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['market', 'sku'], name='product_market_sku_unique'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.category_normalized = self.category.lower()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'category' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'category_normalized'}
+        super().save(*args, **kwargs)
+
@@ -0,0 +1,151 @@
+import re
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.transaction import TransactionManagementError
+from config.pagination import NUMBER, decode_cursor, encode_cursor, parse_limit
+
+FTS_TABLE = 'product_productfts'
+PRODUCT_TABLE = 'product_productmodel'
+_TOKEN_RE = re.compile(r'\w+')
+
+_CREATE_TABLE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    name, description, category,
+    content='{PRODUCT_TABLE}', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+)
+"""
+
+SUSPEND_TABLE = f'{FTS_TABLE}_suspend'
+_CREATE_SUSPEND_TABLE = f"CREATE TABLE IF NOT EXISTS {SUSPEND_TABLE} (id INTEGER PRIMARY KEY)"
+_UNLESS_SUSPENDED = f"WHEN NOT EXISTS (SELECT 1 FROM {SUSPEND_TABLE})"
+
+_TRIGGERS = {
+    f'{FTS_TABLE}_ai': f"""
+    CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {PRODUCT_TABLE} {_UNLESS_SUSPENDED} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description, category)
+        VALUES (new.id, new.name, new.description, new.category);
+    END
+    """,
+    f'{FTS_TABLE}_ad': f"""
+    CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {PRODUCT_TABLE} {_UNLESS_SUSPENDED} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description, category)
+        VALUES ('delete', old.id, old.name, old.description, old.category);
+    END
+    """,
+    f'{FTS_TABLE}_au': f"""
+    CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF name, description, category ON {PRODUCT_TABLE} {_UNLESS_SUSPENDED} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description, category)
+        VALUES ('delete', old.id, old.name, old.description, old.category);
+        INSERT INTO {FTS_TABLE}(rowid, name, description, category)
+        VALUES (new.id, new.name, new.description, new.category);
+    END
+    """,
+}
+
+
+def is_enabled(using=DEFAULT_DB_ALIAS):
+    return connections[using].vendor == 'sqlite'
+
+
+def install(using=DEFAULT_DB_ALIAS):
+    """
+    Create the FTS5 shadow table and the triggers that keep it in sync.
+    Safe to call repeatedly; triggers are recreated if a migration rebuilt
+    the product table.
+    """
+    connection = connections[using]
+    if not is_enabled(using) or PRODUCT_TABLE not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        created = FTS_TABLE not in connection.introspection.table_names(cursor)
+        cursor.execute(_CREATE_TABLE)
+        cursor.execute(_CREATE_SUSPEND_TABLE)
+        for name, trigger in _TRIGGERS.items():
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute(trigger)
+        if created:
+            # name matches weigh most, then category, then description
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', 'bm25(10.0, 1.0, 4.0)')")
+            rebuild(using)
+
+
+def rebuild(using=DEFAULT_DB_ALIAS):
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+@contextmanager
+def deferred_sync(queryset):
+    """
+    Replace the per-row triggers with two set-based statements for a bulk
+    write to the rows selected by ``queryset``: their index entries are
+    dropped on entry and re-added from the final rows on exit.
+
+    Must run inside ``transaction.atomic()``. SQLite admits one writer at a
+    time, so no other connection can write products while the suspend row
+    is visible, and it is rolled back along with the write on error.
+    """
+    connection = connections[queryset.db]
+    if not is_enabled(queryset.db):
+        yield
+        return
+    if not connection.in_atomic_block:
+        raise TransactionManagementError("deferred_sync() requires an atomic block.")
+    select, params = queryset.values_list('id', 'name', 'description', 'category').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {SUSPEND_TABLE} DEFAULT VALUES")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description, category) "
+            f"SELECT 'delete', * FROM ({select})",
+            params,
+        )
+        yield
+        cursor.execute(f"INSERT INTO {FTS_TABLE}(rowid, name, description, category) SELECT * FROM ({select})", params)
+        cursor.execute(f"DELETE FROM {SUSPEND_TABLE}")
+
+
+def build_match(query):
+    """Every word of ``query`` becomes a quoted prefix term: ``"tel"* "sam"*``."""
+    return ' '.join(f'"{token}"*' for token in _TOKEN_RE.findall(query))
+
+
+def search(queryset, query):
+    """
+    ``queryset`` joined to its full-text matches for ``query``, annotated
+    with ``search_rank`` (bm25, lower is better); the other filters stay in
+    the same WHERE clause. None if ``query`` has no words.
+    """
+    match = build_match(query)
+    if not match:
+        return None
+    return queryset.extra(
+        select={'search_rank': f'{FTS_TABLE}.rank'},
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = {PRODUCT_TABLE}.id', f'{FTS_TABLE} MATCH %s'],
+        params=[match],
+    )
+
+
+def paginate_search(queryset, query, cursor=None, limit=None):
+    """
+    Relevance-ordered counterpart of ``paginate_keyset``, keyed on
+    ``(search_rank, id)``. ``queryset`` carries the other filters.
+    """
+    limit = parse_limit(limit)
+    queryset = search(queryset, query)
+    if queryset is None:
+        return [], None
+    if cursor:
+        rank, pk = decode_cursor(cursor, (NUMBER, int))
+        queryset = queryset.extra(
+            where=[f'({FTS_TABLE}.rank > %s OR ({FTS_TABLE}.rank = %s AND {PRODUCT_TABLE}.id > %s))'],
+            params=[rank, rank, pk],
+        )
+    page = list(queryset.order_by('search_rank', 'id')[:limit + 1])
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor([page[-1].search_rank, page[-1].id])
+    return page, next_cursor
@@ -1,16 +1,19 @@
 from rest_framework import serializers
+from config.fieldsets import SparseFieldsMixin
 from market.serializers import MarketModelSerializer
 from .models import ProductModel
 
-class ProductModelSerializer(serializers.ModelSerializer):
+class ProductModelSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     market = MarketModelSerializer(read_only=True)
     rate = serializers.SerializerMethodField()
 
     class Meta:
         model = ProductModel
-        fields = ['id', 'name', 'description', 'category', 'price', 'discount', 'market', 'available', 'rate']
+        fields = ['id', 'sku', 'name', 'description', 'category', 'price', 'discount', 'market', 'available', 'rate']
+        expandable_fields = {'market': MarketModelSerializer}
+        column_map = {'rate': ['rating_avg', 'rating_count']}
     
     def get_rate(self, obj):
-        if getattr(obj, 'rate', None) is None:
+        if not obj.rating_count:
             return "Hali baxolanmagan"
-        return round(obj.rate, 1)
\ No newline at end of file
+        return round(obj.rating_avg, 1)
\ No newline at end of file
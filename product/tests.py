@@ -1,3 +1,262 @@
-from django.test import TestCase
+import csv
+import json
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from config.cache import invalidate
+from config.metrics import registry
+from config.pagination import encode_cursor
+from market.models import MarketModel
+from user.models import User
+from .exporter import COLUMNS
+from .models import ProductModel
+
+
+class ProductListTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.market = MarketModel.objects.create(name='Market', description='', location='')
+
+    def create_products(self, count, **fields):
+        return [
+            ProductModel.objects.create(**{
+                'market': self.market, 'name': f'Product {i}', 'description': '', 'category': 'Phones',
+                'price': 100, 'discount': 0, **fields,
+            })
+            for i in range(count)
+        ]
+
+    def test_list_not_modified_in_one_query(self):
+        self.create_products(3)
+        response = self.client.get('/product/products/?limit=2')
+        etag = response['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get('/product/products/?limit=2', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_products(1)
+            invalidate('product')
+        response = self.client.get('/product/products/?limit=2', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list_changes_after_writes_that_skip_invalidate(self):
+        products = self.create_products(3)
+        response = self.client.get('/product/products/')
+        etag = response['ETag']
+
+        # an ORM write from another worker, the admin or a command bumps no version counter
+        ProductModel.objects.filter(id=products[0].id).update(name='Renamed', updated_at=timezone.now())
+        response = self.client.get('/product/products/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('Renamed', [product['name'] for product in response.data['products']])
+
+        etag = response['ETag']
+        ProductModel.objects.filter(id=products[1].id).delete()
+        response = self.client.get('/product/products/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['products']), 2)
+
+    def test_search_applies_filters_to_every_match(self):
+        other = MarketModel.objects.create(name='Other', description='', location='')
+        for i in range(30):
+            ProductModel.objects.create(
+                market=other, name=f'Telefon {i}', description='', category='Phones', price=100, discount=0
+            )
+        expected = {product.id for product in self.create_products(7, name='Telefon Samsung')}
+        self.create_products(3, name='Olma')
+
+        seen, cursor = [], None
+        while True:
+            params = {'name': 'tel', 'market': self.market.id, 'limit': 3}
+            if cursor:
+                params['cursor'] = cursor
+            response = self.client.get('/product/products/', params)
+            self.assertEqual(response.status_code, 200)
+            seen += [product['id'] for product in response.data['products']]
+            cursor = response.data['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(len(seen), len(expected))
+        self.assertEqual(set(seen), expected)
+
+    def test_tampered_cursor_is_rejected(self):
+        self.create_products(3, name='Telefon')
+        for values in (['x', 'y'], [{'a': 1}, 1], [1.5, 'y'], [1.5, True], [1.5, 2 ** 70], ['NaN', 1], [1.5]):
+            cursor = encode_cursor(values)
+            for params in ({'cursor': cursor}, {'cursor': cursor, 'name': 'tel'}):
+                response = self.client.get('/product/products/', params)
+                self.assertEqual(response.status_code, 400, (values, params))
+        response = self.client.get('/product/products/', {'cursor': encode_cursor([float('inf'), 1])})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_pages_cover_the_list(self):
+        expected = {product.id for product in self.create_products(7)}
+        seen, cursor = [], None
+        while True:
+            response = self.client.get('/product/products/', {'limit': 3, **({'cursor': cursor} if cursor else {})})
+            seen += [product['id'] for product in response.data['products']]
+            cursor = response.data['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(len(seen), len(expected))
+        self.assertEqual(set(seen), expected)
+
+
+class ProductBatchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.market = MarketModel.objects.create(name='Market', description='', location='')
+        self.products = [
+            ProductModel.objects.create(
+                market=self.market, name=f'Product {i}', description='', category='', price=100, discount=0
+            )
+            for i in range(4)
+        ]
+
+    def batch(self, ids, **params):
+        return self.client.get('/product/batch/', {'ids': ','.join(map(str, ids)), **params})
+
+    def test_order_duplicates_and_missing(self):
+        a, b, c, _ = (product.id for product in self.products)
+        response = self.batch([c, a, 999999, c, b, a])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([product['id'] for product in response.json()['products']], [c, a, b])
+        self.assertEqual(response.json()['missing'], [999999])
+
+    @override_settings(PRODUCT_BATCH_MAX_IDS=3)
+    def test_max_ids(self):
+        ids = [product.id for product in self.products]
+        self.assertEqual(self.batch(ids[:3]).status_code, 200)
+        self.assertEqual(self.batch(ids).status_code, 400)
+        # duplicates do not count against the limit
+        self.assertEqual(self.batch(ids[:3] * 2).status_code, 200)
+
+    def test_fields_and_expand(self):
+        product = self.products[0]
+        response = self.batch([product.id], fields='id,name')
+        self.assertEqual(response.json()['products'], [{'id': product.id, 'name': product.name}])
+
+        response = self.batch([product.id], fields='id,market', expand='market')
+        self.assertEqual(response.json()['products'][0]['market']['id'], self.market.id)
+
+    def test_invalid_ids(self):
+        for ids in ('', 'abc', '1,x', '99999999999999999999999', str(2 ** 63), '-1', '0'):
+            response = self.client.get('/product/batch/', {'ids': ids})
+            self.assertEqual(response.status_code, 400, ids)
+
+
+class ProductImportTest(TestCase):
+    def setUp(self):
+        self.market = MarketModel.objects.create(name='Market', description='', location='')
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='seller'))
+
+    def upload(self, name, content):
+        return self.client.post(
+            '/product/import/', {'market': self.market.id, 'file': SimpleUploadedFile(name, content)}, format='multipart'
+        )
+
+    def test_invalid_utf8_is_reported_per_row(self):
+        content = (
+            '{"sku": "a", "name": "Olma", "category": "Meva", "price": 100}\n'.encode()
+            + b'{"sku": "b", "name": "\xff\xfe", "category": "Meva", "price": 100}\n'
+            + '{"sku": "c", "name": "Nok", "category": "Meva", "price": 100}\n'.encode()
+        )
+        response = self.upload('products.jsonl', content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 2)
+        self.assertEqual(response.json()['errors'], [{'row': 2, 'errors': {'row': 'Row is not valid UTF-8'}}])
+
+    def test_invalid_utf8_in_csv(self):
+        content = b'\xef\xbb\xbfsku,name,category,price\na,Olma,Meva,100\nb,"\xff\nx",Meva,100\nc,Nok,Meva,100\n'
+        response = self.upload('products.csv', content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 2)
+        self.assertEqual(response.json()['errors'], [{'row': 4, 'errors': {'row': 'Row is not valid UTF-8'}}])
+        self.assertEqual(set(ProductModel.objects.values_list('sku', flat=True)), {'a', 'c'})
+
+    def test_integers_outside_64_bits_are_row_errors(self):
+        content = (
+            'sku,name,category,price,discount\n'
+            f'a,Olma,Meva,{2 ** 63},0\n'
+            f'b,Nok,Meva,100,{2 ** 70}\n'
+            f'c,Uzum,Meva,{2 ** 63 - 1},0\n'
+        ).encode()
+        response = self.upload('products.csv', content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 1)
+        self.assertEqual([error['row'] for error in response.json()['errors']], [2, 3])
+        self.assertEqual(
+            response.json()['errors'][0]['errors'], {'price': 'Ensure this value is less than or equal to 9223372036854775807.'}
+        )
+        self.assertEqual(ProductModel.objects.get().price, 2 ** 63 - 1)
+
+
+@override_settings(PRODUCT_EXPORT_CHUNK_SIZE=2)
+class ProductExportTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.market = MarketModel.objects.create(name='Market', description='', location='')
+        self.other = MarketModel.objects.create(name='Other', description='', location='')
+        self.products = [
+            ProductModel.objects.create(
+                market=market, name=f'Olma "{i}", qizil', description='Yangi\nhosil', category=category,
+                price=100 + i, discount=0, available=available,
+            )
+            for i, (market, category, available) in enumerate([
+                (self.market, 'Meva', True), (self.market, 'Meva', False),
+                (self.market, 'Sabzavot', True), (self.other, 'Meva', True), (self.market, 'Meva', True),
+            ])
+        ]
+
+    def export(self, **params):
+        response = self.client.get('/product/export/', params)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_ndjson(self):
+        response, body = self.export()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="products.ndjson"')
+        self.assertTrue(body.endswith('\n'))
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row['id'] for row in rows], [product.id for product in self.products])
+        self.assertEqual(list(rows[0]), COLUMNS)
+        self.assertEqual(rows[0]['name'], 'Olma "0", qizil')
+        self.assertEqual(rows[3]['market'], self.other.id)
+
+    def test_csv(self):
+        response, body = self.export(type='csv')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="products.csv"')
+        rows = list(csv.reader(StringIO(body)))
+        self.assertEqual(rows[0], COLUMNS)
+        self.assertEqual(len(rows), len(self.products) + 1)
+        self.assertEqual(rows[1][COLUMNS.index('description')], 'Yangi\nhosil')
+        self.assertEqual(rows[2][COLUMNS.index('available')], 'False')
+
+    def test_filters(self):
+        _, body = self.export(market=self.market.id, category='meva', available='true')
+        ids = [json.loads(line)['id'] for line in body.splitlines()]
+        self.assertEqual(ids, [self.products[0].id, self.products[4].id])
+
+        for params in ({'type': 'xml'}, {'market': 'abc'}):
+            self.assertEqual(self.client.get('/product/export/', params).status_code, 400, params)
+
+    def test_streamed_body_is_measured(self):
+        with mock.patch.object(registry, 'observe') as observe, self.assertNumQueries(1):
+            _, body = self.export()
+        observed = {call.args[0]: call.args[2] for call in observe.call_args_list}
+        self.assertEqual(observed['http_response_size_bytes'], len(body.encode()))
+        # the export query runs while the body streams, after the view returned
+        self.assertGreater(observed['http_request_db_duration_seconds'], 0)
@@ -1,9 +1,12 @@
 from django.urls import path
-from .views import create_product, list_products, get_product, update_product, delete_product
+from .views import create_product, import_products, export_products, list_products, batch_products, get_product, update_product, delete_product
 
 urlpatterns = [
     path('create/', create_product, name='product-create'),
+    path('import/', import_products, name='product-import'),
+    path('export/', export_products, name='product-export'),
     path('products/', list_products, name='product-list'),
+    path('batch/', batch_products, name='product-batch'),
     path('<int:pk>/', get_product, name='product-detail'),
     path('<int:pk>/update/', update_product, name='product-update'),
     path('<int:pk>/delete/', delete_product, name='product-delete'),
@@ -1,12 +1,78 @@
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, parser_classes
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from .models import ProductModel
+from market.models import MarketModel
 from .serializers import ProductModelSerializer
-from django.db.models import Q, Avg, Count
-from drf_yasg.utils import swagger_auto_schema
-from drf_yasg import openapi
+from django.conf import settings
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from config.cache import cache_response, invalidate
+from config.conditional import conditional, queryset_state
+from config.fieldsets import parse_list_param, sparse_params, sparse_queryset
+from config.pagination import PaginationError, paginate_keyset
+from . import exporter, importer, search
+from config.openapi import openapi, swagger_auto_schema
+
+def product_filters(params):
+    name = params.get('name')
+    price_min = params.get('price_min')
+    price_max = params.get('price_max')
+    category = params.get('category')
+    rate_min = params.get('rate_min')
+    market = params.get('market')
+    available = params.get('available')
+
+    filters = Q()
+
+    if name and not search.is_enabled():
+        filters &= Q(name__icontains=name)
+
+    if price_min:
+        filters &= Q(price__gte=price_min)
+
+    if price_max:
+        filters &= Q(price__lte=price_max)
+
+    if category:
+        filters &= Q(category_normalized=category.lower())
+
+    if rate_min:
+        filters &= Q(rating_avg__gte=rate_min)
+
+    if market:
+        filters &= Q(market_id=market)
+
+    if available:
+        # __in renders "available IN (1)", which can use the (market, available, price) index;
+        # a plain boolean lookup renders a bare column that SQLite cannot match against it.
+        filters &= Q(available__in=[available.lower() in ('1', 'true')])
+
+    return filters
+
+def product_list_state(request):
+    relations = ('market',) if 'market' in parse_list_param(request.GET.get('expand')) else ()
+    products = ProductModel.objects.filter(product_filters(request.GET))
+    return queryset_state(products, relations, versions=('product', 'market', 'rate'))
+
+def parse_ids(params):
+    ids = list(dict.fromkeys(int(pk) for pk in parse_list_param(params.get('ids'))))
+    # ids are 64-bit row ids; larger values cannot even be bound as query parameters
+    if any(not 0 < pk < 2 ** 63 for pk in ids):
+        raise ValueError("id out of range")
+    return ids
+
+def product_batch_state(request):
+    try:
+        ids = parse_ids(request.GET)
+    except ValueError:
+        return None, None
+    return queryset_state(ProductModel.objects.filter(id__in=ids[:settings.PRODUCT_BATCH_MAX_IDS]), ('market',))
+
+def product_state(request, pk):
+    return queryset_state(ProductModel.objects.filter(id=pk), ('market',))
 
 @swagger_auto_schema(
     methods=['POST'],
@@ -31,15 +97,131 @@ def create_product(request):
     if not serializer.is_valid():
         return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
     product = serializer.save()
+    invalidate('product')
     return Response({"new_product": ProductModelSerializer(product).data}, status=status.HTTP_201_CREATED)
 
+@swagger_auto_schema(
+    methods=['POST'],
+    manual_parameters=[
+        openapi.Parameter(
+            'file',
+            openapi.IN_FORM,
+            description="CSV (with a header row) or JSONL file with sku, name, description, category, price, discount, available",
+            type=openapi.TYPE_FILE,
+            required=True
+        ),
+        openapi.Parameter(
+            'market',
+            openapi.IN_FORM,
+            description="Market ID the products belong to",
+            type=openapi.TYPE_INTEGER,
+            required=True
+        ),
+        openapi.Parameter(
+            'format',
+            openapi.IN_FORM,
+            description="csv or jsonl; detected from the file name when omitted",
+            type=openapi.TYPE_STRING,
+            required=False
+        )
+    ],
+    responses={
+        200: "Import report with created/updated counts and per-row errors",
+        400: "Bad Request",
+        401: "Unauthorized"
+    },
+    operation_description="Bulk create or update a market's products, matched on sku"
+)
+@api_view(http_method_names=['POST'])
+@parser_classes([MultiPartParser])
+def import_products(request):
+    user = request.user
+    if not user.is_authenticated:
+        return Response({"error": "Avtarizatsiyadan ot oldin"}, status=status.HTTP_401_UNAUTHORIZED)
+    upload = request.FILES.get('file')
+    if not upload:
+        return Response({"error": "file yuborilmagan"}, status=status.HTTP_400_BAD_REQUEST)
+    fmt = request.data.get('format') or importer.detect_format(upload.name)
+    if fmt not in importer.FORMATS:
+        return Response({"error": "format csv yoki jsonl bo'lishi kerak"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        market = MarketModel.objects.get(id=request.data.get('market'))
+    except (MarketModel.DoesNotExist, ValueError, TypeError):
+        return Response({"error": "Market not found"}, status=status.HTTP_400_BAD_REQUEST)
+    report = importer.import_products(upload.file, market, fmt)
+    invalidate('product')
+    return Response(report, status=status.HTTP_200_OK)
+
+@swagger_auto_schema(
+    methods=['GET'],
+    manual_parameters=[
+        openapi.Parameter(
+            'type',
+            openapi.IN_QUERY,
+            description="ndjson (default) or csv",
+            type=openapi.TYPE_STRING,
+            required=False
+        ),
+        openapi.Parameter(
+            'market',
+            openapi.IN_QUERY,
+            description="Filter by market ID",
+            type=openapi.TYPE_INTEGER,
+            required=False
+        ),
+        openapi.Parameter(
+            'category',
+            openapi.IN_QUERY,
+            description="Filter by category",
+            type=openapi.TYPE_STRING,
+            required=False
+        ),
+        openapi.Parameter(
+            'available',
+            openapi.IN_QUERY,
+            description="Filter by availability",
+            type=openapi.TYPE_BOOLEAN,
+            required=False
+        )
+    ],
+    responses={
+        200: "Streamed catalog, one product per line, ordered by id",
+        400: "Bad Request"
+    },
+    operation_description="Stream the whole product catalog as newline-delimited JSON or CSV"
+)
+@api_view(['GET'])
+def export_products(request):
+    fmt = request.query_params.get('type', 'ndjson')
+    if fmt not in exporter.FORMATS:
+        return Response({"error": "type ndjson yoki csv bo'lishi kerak"}, status=status.HTTP_400_BAD_REQUEST)
+    market = request.query_params.get('market')
+    category = request.query_params.get('category')
+    available = request.query_params.get('available')
+    if market and not market.isdigit():
+        return Response({"error": "market ID noto'g'ri"}, status=status.HTTP_400_BAD_REQUEST)
+
+    filters = Q()
+    if market:
+        filters &= Q(market_id=market)
+    if category:
+        filters &= Q(category_normalized=category.lower())
+    if available:
+        filters &= Q(available__in=[available.lower() in ('1', 'true')])
+
+    response = StreamingHttpResponse(
+        exporter.export_products(ProductModel.objects.filter(filters), fmt), content_type=exporter.FORMATS[fmt]
+    )
+    response['Content-Disposition'] = f'attachment; filename="products.{fmt}"'
+    return response
+
 @swagger_auto_schema(
     methods=['GET'],
     manual_parameters=[
         openapi.Parameter(
             'name',
             openapi.IN_QUERY,
-            description="Filter products by name",
+            description="Full-text search over name, description and category (prefix matching, relevance ordered)",
             type=openapi.TYPE_STRING,
             required=False
         ),
@@ -77,6 +259,41 @@ def create_product(request):
             description="Filter by market ID",
             type=openapi.TYPE_INTEGER,
             required=False
+        ),
+        openapi.Parameter(
+            'available',
+            openapi.IN_QUERY,
+            description="Filter by availability",
+            type=openapi.TYPE_BOOLEAN,
+            required=False
+        ),
+        openapi.Parameter(
+            'cursor',
+            openapi.IN_QUERY,
+            description="Opaque cursor from the previous page's next_cursor",
+            type=openapi.TYPE_STRING,
+            required=False
+        ),
+        openapi.Parameter(
+            'limit',
+            openapi.IN_QUERY,
+            description="Page size",
+            type=openapi.TYPE_INTEGER,
+            required=False
+        ),
+        openapi.Parameter(
+            'fields',
+            openapi.IN_QUERY,
+            description="Comma-separated fields to return",
+            type=openapi.TYPE_STRING,
+            required=False
+        ),
+        openapi.Parameter(
+            'expand',
+            openapi.IN_QUERY,
+            description="Comma-separated relations to nest: market",
+            type=openapi.TYPE_STRING,
+            required=False
         )
     ],
     responses={
@@ -85,49 +302,95 @@ def create_product(request):
             schema=ProductModelSerializer(many=True)
         )
     },
-    operation_description="Get list of all products with various filters"
+    operation_description="Get a page of products with various filters; pass next_cursor back as cursor for the next page"
 )
-@api_view(['GET'])  
+@conditional(product_list_state)
+@cache_response('product', 'market', 'rate')
+@api_view(['GET'])
 def list_products(request):
     name = request.query_params.get('name')
-    price_min = request.query_params.get('price_min')
-    price_max = request.query_params.get('price_max')
-    category = request.query_params.get('category')
-    rate_min = request.query_params.get('rate_min')
-    market = request.query_params.get('market')
+    fields, expand = sparse_params(request)
 
-    products = ProductModel.objects.annotate(
-        avg_rate=Avg('rates__rate'), 
-        clients_count=Count('rates')
+    products = sparse_queryset(
+        ProductModel.objects.all(), ProductModelSerializer, fields, expand, required=('rank_score',)
     )
-
-    filters = Q()
-
-    if name:
-        filters &= Q(name__icontains=name)
-
-    if price_min:
-        filters &= Q(price__gte=price_min)
-
-    if price_max:
-        filters &= Q(price__lte=price_max)
-
-    if category:
-        filters &= Q(category__iexact=category)
-
-    if rate_min:
-        filters &= Q(avg_rate_gte=rate_min)
-
-    if market:
-        filters &= Q(market_id=market)
-
+    filters = product_filters(request.query_params)
     if filters:
         products = products.filter(filters)
 
-    products = products.order_by('-avg_rate', '-clients_count')
+    cursor = request.query_params.get('cursor')
+    limit = request.query_params.get('limit')
+    try:
+        if name and search.is_enabled():
+            page, next_cursor = search.paginate_search(products, name, cursor=cursor, limit=limit)
+        else:
+            page, next_cursor = paginate_keyset(products, ('-rank_score', '-id'), cursor=cursor, limit=limit)
+    except PaginationError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-    serializer = ProductModelSerializer(products, many=True)
-    return Response({"products": serializer.data}, status=status.HTTP_200_OK)
+    serializer = ProductModelSerializer(page, many=True, fields=fields, expand=expand)
+    return Response({"products": serializer.data, "next_cursor": next_cursor}, status=status.HTTP_200_OK)
+
+@swagger_auto_schema(
+    methods=['GET'],
+    manual_parameters=[
+        openapi.Parameter(
+            'ids',
+            openapi.IN_QUERY,
+            description="Comma-separated product IDs",
+            type=openapi.TYPE_STRING,
+            required=True
+        ),
+        openapi.Parameter(
+            'fields',
+            openapi.IN_QUERY,
+            description="Comma-separated fields to return",
+            type=openapi.TYPE_STRING,
+            required=False
+        ),
+        openapi.Parameter(
+            'expand',
+            openapi.IN_QUERY,
+            description="Comma-separated relations to nest: market (all nested when omitted)",
+            type=openapi.TYPE_STRING,
+            required=False
+        )
+    ],
+    responses={
+        200: openapi.Response(
+            description="Products in the requested order and the IDs that were not found",
+            schema=ProductModelSerializer(many=True)
+        ),
+        400: "Bad Request"
+    },
+    operation_description="Get many products by ID in one request"
+)
+@conditional(product_batch_state)
+@cache_response('product', 'market', 'rate')
+@api_view(['GET'])
+def batch_products(request):
+    try:
+        ids = parse_ids(request.query_params)
+    except ValueError:
+        return Response({"error": "ids butun sonlar bo'lishi kerak"}, status=status.HTTP_400_BAD_REQUEST)
+    if not ids:
+        return Response({"error": "ids yuborilmagan"}, status=status.HTTP_400_BAD_REQUEST)
+    if len(ids) > settings.PRODUCT_BATCH_MAX_IDS:
+        return Response(
+            {"error": f"Ko'pi bilan {settings.PRODUCT_BATCH_MAX_IDS} ta ID yuborish mumkin"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    fields, expand = sparse_params(request)
+    if 'expand' not in request.query_params:
+        expand = None
+
+    products = sparse_queryset(ProductModel.objects.all(), ProductModelSerializer, fields, expand).in_bulk(ids)
+    found = [products[pk] for pk in ids if pk in products]
+    serializer = ProductModelSerializer(found, many=True, fields=fields, expand=expand)
+    return Response(
+        {"products": serializer.data, "missing": [pk for pk in ids if pk not in products]},
+        status=status.HTTP_200_OK
+    )
 
 @swagger_auto_schema(
     methods=['GET'],
@@ -140,10 +403,12 @@ def list_products(request):
     },
     operation_description="Get detailed information about a specific product"
 )
+@conditional(product_state)
+@cache_response('product', 'market', 'rate')
 @api_view(['GET'])
 def get_product(request, pk):
     try:
-        product = ProductModel.objects.annotate(rate=Avg("rates__rate")).get(id=pk)
+        product = ProductModel.objects.select_related('market').get(id=pk)
     except ProductModel.DoesNotExist:
         return Response({"error": "Product not found"}, status=status.HTTP_404_NOT_FOUND)
     serializer = ProductModelSerializer(product)
@@ -176,6 +441,7 @@ def update_product(request, pk):
     if not serializer.is_valid():
         return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
     serializer.save()
+    invalidate('product')
     return Response({"message": "Product is updated", "product": serializer.data}, status=status.HTTP_200_OK)
 
 @swagger_auto_schema(
@@ -197,4 +463,5 @@ def delete_product(request, pk):
     except ProductModel.DoesNotExist:
         return Response({"error": "Product not found"}, status=status.HTTP_404_NOT_FOUND)
     product.delete()
+    invalidate('product')
     return Response({"message": "Product is deleted"}, status=status.HTTP_200_OK)
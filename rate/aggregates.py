@@ -0,0 +1,72 @@
+from django.db.models import Case, Count, F, FloatField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from config.ranking import bayesian_score, prior_score
+from market.models import MarketModel
+from product.models import ProductModel
+from sync import changes
+from .models import RateModel
+
+
+def _targets(product_id, market_id):
+    if product_id:
+        yield ProductModel, product_id
+    if market_id:
+        yield MarketModel, market_id
+
+
+def adjust_rating(product_id, market_id, delta_sum, delta_count):
+    now = timezone.now()
+    rating_sum, rating_count = F('rating_sum') + delta_sum, F('rating_count') + delta_count
+    for model, pk in _targets(product_id, market_id):
+        model.objects.filter(pk=pk).update(
+            updated_at=now,
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            rating_avg=Case(
+                When(rating_count__lte=-delta_count, then=Value(0.0)),
+                default=rating_sum / rating_count,
+                output_field=FloatField(),
+            ),
+            rank_score=Case(
+                When(rating_count__lte=-delta_count, then=Value(prior_score())),
+                default=bayesian_score(rating_sum, rating_count),
+                output_field=FloatField(),
+            ),
+        )
+        changes.record(model, [pk])
+
+
+def rate_added(rate):
+    adjust_rating(rate.product_id, rate.market_id, rate.rate, 1)
+
+
+def rate_removed(rate):
+    adjust_rating(rate.product_id, rate.market_id, -rate.rate, -1)
+
+
+def rate_changed(previous, rate):
+    """Move totals from ``previous`` (product_id, market_id, rate) to the saved ``rate``."""
+    product_id, market_id, value = previous
+    if (product_id, market_id) == (rate.product_id, rate.market_id):
+        if value != rate.rate:
+            adjust_rating(product_id, market_id, rate.rate - value, 0)
+        return
+    adjust_rating(product_id, market_id, -value, -1)
+    rate_added(rate)
+
+
+def rebuild_rating_aggregates():
+    for model, field in ((ProductModel, 'product'), (MarketModel, 'market')):
+        rates = RateModel.objects.filter(**{field: OuterRef('pk')}).order_by().values(field)
+        model.objects.update(
+            rating_sum=Coalesce(Subquery(rates.annotate(total=Sum('rate')).values('total')), Value(0.0)),
+            rating_count=Coalesce(Subquery(rates.annotate(total=Count('id')).values('total')), Value(0)),
+            updated_at=timezone.now(),
+        )
+        model.objects.filter(rating_count__gt=0).update(
+            rating_avg=F('rating_sum') / F('rating_count'),
+            rank_score=bayesian_score(F('rating_sum'), F('rating_count')),
+        )
+        model.objects.filter(rating_count=0).update(rating_avg=0, rank_score=prior_score())
+        changes.record_queryset(model.objects.all())
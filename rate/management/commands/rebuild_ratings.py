@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from config.cache import invalidate
+from rate.aggregates import rebuild_rating_aggregates
+
+
+class Command(BaseCommand):
+    help = "Recompute rating_sum / rating_count / rating_avg for every product and market"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuild_rating_aggregates()
+            invalidate('rate')
+        self.stdout.write(self.style.SUCCESS("Rating aggregates rebuilt"))
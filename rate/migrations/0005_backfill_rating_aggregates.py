@@ -0,0 +1,28 @@
+from django.db import migrations
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill(apps, schema_editor):
+    RateModel = apps.get_model('rate', 'RateModel')
+    for model_name, field in (('product.ProductModel', 'product'), ('market.MarketModel', 'market')):
+        model = apps.get_model(model_name)
+        rates = RateModel.objects.filter(**{field: OuterRef('pk')}).order_by().values(field)
+        model.objects.update(
+            rating_sum=Coalesce(Subquery(rates.annotate(total=Sum('rate')).values('total')), Value(0.0)),
+            rating_count=Coalesce(Subquery(rates.annotate(total=Count('id')).values('total')), Value(0)),
+        )
+        model.objects.filter(rating_count__gt=0).update(rating_avg=F('rating_sum') / F('rating_count'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rate', '0004_alter_ratemodel_rate'),
+        ('product', '0003_productmodel_rating_aggregates'),
+        ('market', '0004_marketmodel_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
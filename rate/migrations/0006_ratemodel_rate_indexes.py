@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-18 18:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market', '0005_marketmodel_market_rating_order_idx'),
+        ('product', '0005_productmodel_category_normalized_and_indexes'),
+        ('rate', '0005_backfill_rating_aggregates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ratemodel',
+            index=models.Index(fields=['product', 'rate'], name='rate_product_rate_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ratemodel',
+            index=models.Index(fields=['market', 'rate'], name='rate_market_rate_idx'),
+        ),
+    ]
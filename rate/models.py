@@ -26,6 +26,12 @@ class RateModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # rate is included so per-product / per-market totals are read from the index alone
+            models.Index(fields=['product', 'rate'], name='rate_product_rate_idx'),
+            models.Index(fields=['market', 'rate'], name='rate_market_rate_idx'),
+        ]
 
     def __str__(self):
         return self.product.name
@@ -1,7 +1,10 @@
 from rest_framework import serializers
+from config.fieldsets import SparseFieldsMixin
+from market.serializers import MarketModelSerializer
+from product.serializers import ProductModelSerializer
 from .models import RateModel
 
-class RateModelSerializer(serializers.ModelSerializer):
+class RateModelSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = RateModel
         fields = ['id', 'product', 'market', 'user', 'message', 'rate', 'anonym', 'created_at', 'updated_at']
@@ -9,4 +12,5 @@ class RateModelSerializer(serializers.ModelSerializer):
             'product': {'required': False, 'allow_null': True},
             'market': {'required': False, 'allow_null': True},
         }
-        read_only_fields = ['user', 'created_at', 'updated_at']
\ No newline at end of file
+        read_only_fields = ['user', 'created_at', 'updated_at']
+        expandable_fields = {'product': ProductModelSerializer, 'market': MarketModelSerializer}
\ No newline at end of file
@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from config.cache import invalidate
+from .aggregates import rate_added, rate_changed, rate_removed
+from .models import RateModel
+
+# Rating totals follow every write of a rate, whether it comes from the API,
+# the admin, the shell, fixtures or a cascade from its product, market or user.
+
+
+def remember_rate(sender, instance, **kwargs):
+    instance._previous_rate = None
+    if instance.pk is not None:
+        instance._previous_rate = (
+            RateModel.objects.filter(pk=instance.pk).values_list('product_id', 'market_id', 'rate').first()
+        )
+
+
+def save_rate(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_rate', None)
+    if previous is None:
+        rate_added(instance)
+    else:
+        rate_changed(previous, instance)
+    invalidate('rate')
+
+
+def remove_rate(sender, instance, **kwargs):
+    rate_removed(instance)
+    invalidate('rate')
+
+
+def connect():
+    pre_save.connect(remember_rate, sender=RateModel, dispatch_uid='rate_remember_save')
+    post_save.connect(save_rate, sender=RateModel, dispatch_uid='rate_adjust_save')
+    post_delete.connect(remove_rate, sender=RateModel, dispatch_uid='rate_remove_delete')
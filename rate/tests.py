@@ -1,3 +1,136 @@
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
+from config.ranking import bayesian_score, prior_score
+from rest_framework.test import APIClient
+from market.models import MarketModel
+from product.models import ProductModel
+from user.models import User
+from .models import RateModel
+
+
+class RatingAggregateTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='rater')
+        self.other = User.objects.create(username='other')
+        self.market = MarketModel.objects.create(name='Market', description='', location='')
+        self.product = ProductModel.objects.create(
+            market=self.market, name='Product', description='', category='', price=100, discount=0
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def rate(self, value, user=None):
+        client = APIClient()
+        client.force_authenticate(user or self.user)
+        response = client.post(
+            '/rate/create/', {'product': self.product.id, 'market': self.market.id, 'message': 'Yaxshi', 'rate': value}
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()['rate']['id']
+
+    def assertRating(self, obj, rating_sum, rating_count):
+        obj.refresh_from_db()
+        self.assertEqual((obj.rating_sum, obj.rating_count), (rating_sum, rating_count))
+
+    def test_update_and_delete_adjust_totals_once(self):
+        pk = self.rate(4)
+        self.rate(2, user=self.other)
+        response = self.client.patch(f'/rate/{pk}/update/', {'rate': 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertRating(self.product, 7, 2)
+
+        response = self.client.delete(f'/rate/{pk}/delete/')
+        self.assertEqual(response.status_code, 200)
+        self.assertRating(self.product, 2, 1)
+        self.assertRating(self.market, 2, 1)
+
+    def test_patch_adjusts_each_target_once(self):
+        pk = self.rate(4)
+        with self.assertNumQueries(12) as queries:
+            self.client.patch(f'/rate/{pk}/update/', {'rate': 5})
+        updates = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('UPDATE')]
+        # the rate itself, then one delta per product and market
+        self.assertEqual(len(updates), 3)
+        self.assertRating(self.product, 5, 1)
+        self.assertRating(self.market, 5, 1)
+
+    def test_orm_writes_adjust_totals(self):
+        rate = RateModel.objects.create(product=self.product, market=self.market, user=self.user, message='', rate=4)
+        self.assertRating(self.product, 4, 1)
+
+        rate.rate = 2
+        rate.save()
+        self.assertRating(self.product, 2, 1)
+        self.assertRating(self.market, 2, 1)
+
+        other = ProductModel.objects.create(
+            market=self.market, name='Other', description='', category='', price=100, discount=0
+        )
+        rate.product = other
+        rate.save()
+        self.assertRating(self.product, 0, 0)
+        self.assertRating(other, 2, 1)
+        self.assertRating(self.market, 2, 1)
+
+    def test_cascade_deletes_adjust_totals(self):
+        self.rate(4)
+        self.rate(2, user=self.other)
+        self.product.delete()
+        self.assertRating(self.market, 0, 0)
+        self.assertEqual(self.market.rating_avg, 0)
+
+        self.product = ProductModel.objects.create(
+            market=self.market, name='Product', description='', category='', price=100, discount=0
+        )
+        self.rate(4)
+        self.rate(2, user=self.other)
+        self.other.delete()
+        self.assertRating(self.product, 4, 1)
+        self.assertRating(self.market, 4, 1)
+
+    def assertRankScore(self, obj, expected):
+        obj.refresh_from_db()
+        self.assertAlmostEqual(obj.rank_score, expected)
+
+    def test_rank_score_follows_rates(self):
+        self.assertRankScore(self.product, prior_score())
+        pk = self.rate(5)
+        self.assertRankScore(self.product, bayesian_score(5, 1))
+        self.rate(1, user=self.other)
+        self.assertRankScore(self.market, bayesian_score(6, 2))
+
+        self.client.patch(f'/rate/{pk}/update/', {'rate': 2})
+        self.assertRankScore(self.product, bayesian_score(3, 2))
+        self.assertRankScore(self.market, bayesian_score(3, 2))
+
+        self.client.delete(f'/rate/{pk}/delete/')
+        self.assertRankScore(self.product, bayesian_score(1, 1))
+        RateModel.objects.all().delete()
+        self.assertRankScore(self.product, prior_score())
+        self.assertRankScore(self.market, prior_score())
+
+    def test_rank_score_matches_rebuild(self):
+        other = ProductModel.objects.create(
+            market=self.market, name='Other', description='', category='', price=100, discount=0
+        )
+        pk = self.rate(5)
+        self.rate(2, user=self.other)
+        self.client.patch(f'/rate/{pk}/update/', {'rate': 4})
+        RateModel.objects.create(product=other, market=self.market, user=self.user, message='', rate=3)
+        RateModel.objects.filter(user=self.other).get().delete()
+
+        objects = (self.product, other, self.market)
+        incremental = []
+        for obj in objects:
+            obj.refresh_from_db()
+            incremental.append((obj.rating_sum, obj.rating_count, obj.rating_avg, obj.rank_score))
 
-# Create your tests here.
+        call_command('rebuild_ratings', stdout=StringIO())
+        for obj, (rating_sum, rating_count, rating_avg, rank_score) in zip(objects, incremental):
+            obj.refresh_from_db()
+            self.assertEqual((obj.rating_sum, obj.rating_count), (rating_sum, rating_count))
+            self.assertAlmostEqual(obj.rating_avg, rating_avg)
+            self.assertAlmostEqual(obj.rank_score, rank_score)
+        self.assertAlmostEqual(self.market.rank_score, bayesian_score(7, 2))
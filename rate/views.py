@@ -3,10 +3,11 @@ from rest_framework.response import Response
 from rest_framework import status
 from .models import RateModel
 from .serializers import RateModelSerializer
+from django.db import transaction
+from config.fieldsets import sparse_params, sparse_queryset
 from django.db.models import Q
 from django.shortcuts import get_object_or_404
-from drf_yasg.utils import swagger_auto_schema
-from drf_yasg import openapi
+from config.openapi import openapi, swagger_auto_schema
 
 @swagger_auto_schema(
     methods=['POST'],
@@ -30,7 +31,9 @@ def create_rate(request):
     serializer = RateModelSerializer(data=data)
     
     if serializer.is_valid():
-        serializer.save(user=request.user)
+        # the rate signals adjust the product and market totals in the same transaction
+        with transaction.atomic():
+            serializer.save(user=request.user)
         return Response({"rate": serializer.data}, status=status.HTTP_201_CREATED)
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -51,6 +54,20 @@ def create_rate(request):
             description="Filter rates by market ID",
             type=openapi.TYPE_INTEGER,
             required=False
+        ),
+        openapi.Parameter(
+            'fields',
+            openapi.IN_QUERY,
+            description="Comma-separated fields to return",
+            type=openapi.TYPE_STRING,
+            required=False
+        ),
+        openapi.Parameter(
+            'expand',
+            openapi.IN_QUERY,
+            description="Comma-separated relations to nest: product, market",
+            type=openapi.TYPE_STRING,
+            required=False
         )
     ],
     responses={
@@ -65,6 +82,7 @@ def create_rate(request):
 def list_rates(request):
     product_id = request.query_params.get('product')
     market_id = request.query_params.get('market')
+    fields, expand = sparse_params(request)
     filters = Q()
 
     if product_id:
@@ -73,8 +91,8 @@ def list_rates(request):
     if market_id:
         filters &= Q(market__id=market_id)
 
-    rates = RateModel.objects.filter(filters)
-    serializer = RateModelSerializer(rates, many=True)
+    rates = sparse_queryset(RateModel.objects.filter(filters), RateModelSerializer, fields, expand)
+    serializer = RateModelSerializer(rates, many=True, fields=fields, expand=expand)
     return Response({"rates": serializer.data}, status=status.HTTP_200_OK)
 
 @swagger_auto_schema(
@@ -124,7 +142,12 @@ def update_rate(request, pk):
 
     serializer = RateModelSerializer(rate, data=request.data, partial=True)
     if serializer.is_valid():
-        serializer.save()
+        with transaction.atomic():
+            # lock the row so the totals move from the value concurrent updates left behind
+            serializer.instance = RateModel.objects.select_for_update().filter(id=rate.id).first()
+            if serializer.instance is None:
+                return Response({"error": "Rate not found"}, status=status.HTTP_404_NOT_FOUND)
+            serializer.save()
         return Response({"message": "Rate updated", "rate": serializer.data}, status=status.HTTP_200_OK)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -148,5 +171,8 @@ def delete_rate(request, pk):
         return Response({"error": "Rate not found"}, status=status.HTTP_404_NOT_FOUND)
     if rate.user != request.user:
         return Response({"error": "Faqat ozinikini ochirolisan"}, status=status.HTTP_403_FORBIDDEN)
-    rate.delete()
+    with transaction.atomic():
+        rate = RateModel.objects.select_for_update().filter(id=rate.id).first()
+        if rate is not None:
+            rate.delete()
     return Response({"message": "Rate deleted"}, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -0,0 +1,79 @@
+from django.db import connections
+from django.utils import timezone
+from config.fieldsets import sparse_queryset
+from market.models import MarketModel
+from market.serializers import MarketModelSerializer
+from product.models import ProductModel
+from product.serializers import ProductModelSerializer
+from rate.models import RateModel
+from rate.serializers import RateModelSerializer
+from .models import ChangeLogModel
+
+TRACKED = {
+    'product': (ProductModel, ProductModelSerializer),
+    'market': (MarketModel, MarketModelSerializer),
+    'rate': (RateModel, RateModelSerializer),
+}
+LABELS = {model: label for label, (model, serializer) in TRACKED.items()}
+
+
+def record(model, ids, deleted=False):
+    ChangeLogModel.objects.bulk_create([
+        ChangeLogModel(model=LABELS[model], object_id=pk, deleted=deleted) for pk in ids
+    ])
+
+
+def record_queryset(queryset):
+    """Log every row of ``queryset`` as changed, in one INSERT ... SELECT; for bulk writes that skip signals."""
+    connection = connections[queryset.db]
+    select, params = queryset.order_by().values_list('pk').query.sql_with_params()
+    table = connection.ops.quote_name(ChangeLogModel._meta.db_table)
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (object_id, model, deleted, created_at) SELECT *, %s, %s, %s FROM ({select}) changed",
+            [LABELS[queryset.model], False, now, *params],
+        )
+
+
+def changes_since(token, limit):
+    """
+    The changes logged after ``token`` as ``(changes, next_token, has_more)``.
+
+    At most ``limit`` log entries are read. Entries for the same object
+    collapse into one carrying its current row, and rows that no longer
+    exist are reported as deleted. SQLite admits one writer at a time, so
+    entry ids become visible in increasing order and a token never skips
+    a change.
+    """
+    entries = list(
+        ChangeLogModel.objects.filter(id__gt=token).order_by('id')
+        .values_list('id', 'model', 'object_id', 'deleted')[:limit + 1]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    if not entries:
+        return [], token, False
+
+    latest = {}
+    for _, label, object_id, deleted in entries:
+        latest.pop((label, object_id), None)
+        latest[(label, object_id)] = deleted
+
+    data = {}
+    for label, (model, serializer_class) in TRACKED.items():
+        ids = [object_id for (name, object_id), deleted in latest.items() if name == label and not deleted]
+        if not ids:
+            continue
+        rows = sparse_queryset(model.objects.all(), serializer_class, expand=[]).filter(id__in=ids)
+        for row in serializer_class(rows, many=True, expand=[]).data:
+            data[(label, row['id'])] = row
+
+    changes = []
+    for key, deleted in latest.items():
+        label, object_id = key
+        if key in data:
+            changes.append({"type": label, "id": object_id, "deleted": False, "data": data[key]})
+        else:
+            changes.append({"type": label, "id": object_id, "deleted": True})
+    return changes, entries[-1][0], has_more
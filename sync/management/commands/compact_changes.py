@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from sync.models import ChangeLogModel
+
+
+class Command(BaseCommand):
+    help = "Delete change-log entries superseded by a later entry for the same object"
+
+    def handle(self, *args, **options):
+        latest = ChangeLogModel.objects.values('model', 'object_id').annotate(last=Max('id')).values('last')
+        deleted, _ = ChangeLogModel.objects.exclude(id__in=latest).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} superseded change entries"))
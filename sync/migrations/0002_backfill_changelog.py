@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def backfill(apps, schema_editor):
+    ChangeLogModel = apps.get_model('sync', 'ChangeLogModel')
+    for label, model_name in (('market', 'market.MarketModel'), ('product', 'product.ProductModel'), ('rate', 'rate.RateModel')):
+        ids = apps.get_model(model_name).objects.order_by('id').values_list('id', flat=True).iterator(chunk_size=2000)
+        ChangeLogModel.objects.bulk_create((ChangeLogModel(model=label, object_id=pk) for pk in ids), batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sync', '0001_initial'),
+        ('market', '0006_alter_marketmodel_updated_at'),
+        ('product', '0007_alter_productmodel_updated_at'),
+        ('rate', '0006_ratemodel_rate_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+from django.db import models
+
+class ChangeLogModel(models.Model):
+    MODEL_CHOICES = (
+        ('product', 'product'),
+        ('market', 'market'),
+        ('rate', 'rate'),
+    )
+
+    model = models.CharField(max_length=20, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model', 'object_id'], name='sync_change_object_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id}"
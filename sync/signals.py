@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from .changes import LABELS, record
+
+
+def log_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record(sender, [instance.pk])
+
+
+def log_delete(sender, instance, **kwargs):
+    record(sender, [instance.pk], deleted=True)
+
+
+def connect():
+    for model in LABELS:
+        post_save.connect(log_save, sender=model, dispatch_uid=f'sync_save_{LABELS[model]}')
+        post_delete.connect(log_delete, sender=model, dispatch_uid=f'sync_delete_{LABELS[model]}')
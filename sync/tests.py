@@ -0,0 +1,87 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+from market.models import MarketModel
+from product.models import ProductModel
+from .models import ChangeLogModel
+
+
+class ChangeFeedTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.market = MarketModel.objects.create(name='Market', description='', location='')
+
+    def create_product(self, name='Product'):
+        return ProductModel.objects.create(
+            market=self.market, name=name, description='', category='', price=100, discount=0
+        )
+
+    def changes(self, since=0, limit=None):
+        params = {'since': since, **({'limit': limit} if limit else {})}
+        response = self.client.get('/sync/changes/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def sync_all(self, since=0, limit=2):
+        seen = []
+        while True:
+            page = self.changes(since, limit)
+            seen += page['changes']
+            since = page['next_token']
+            if not page['has_more']:
+                return seen, since
+
+    def test_deleted_rows_are_tombstones(self):
+        product = self.create_product()
+        token = self.changes()['next_token']
+        product_id = product.id
+        product.delete()
+        changes = self.changes(token)['changes']
+        self.assertEqual(changes, [{'type': 'product', 'id': product_id, 'deleted': True}])
+
+    def test_repeated_entries_collapse_into_the_current_row(self):
+        token = self.changes()['next_token']
+        product = self.create_product()
+        for name in ('Second', 'Third'):
+            product.name = name
+            product.save()
+        changes = self.changes(token)['changes']
+        self.assertEqual(len(changes), 1)
+        self.assertEqual(changes[0]['data']['name'], 'Third')
+        self.assertFalse(changes[0]['deleted'])
+
+    def test_pages_follow_next_token(self):
+        products = [self.create_product(f'Product {i}') for i in range(5)]
+        first = self.changes(limit=2)
+        self.assertTrue(first['has_more'])
+        self.assertEqual(len(first['changes']), 2)
+
+        seen, token = self.sync_all()
+        ids = {change['id'] for change in seen if change['type'] == 'product'}
+        self.assertEqual(ids, {product.id for product in products})
+        self.assertEqual(token, ChangeLogModel.objects.latest('id').id)
+        self.assertEqual(self.changes(token), {'changes': [], 'next_token': token, 'has_more': False})
+
+    def test_tokens_survive_compaction(self):
+        product = self.create_product()
+        token = self.changes()['next_token']
+        for name in ('Second', 'Third'):
+            product.name = name
+            product.save()
+        other = self.create_product('Other')
+        before, end = self.sync_all(token)
+
+        call_command('compact_changes', stdout=StringIO())
+        self.assertEqual(ChangeLogModel.objects.filter(model='product', object_id=product.id).count(), 1)
+        after, end_after = self.sync_all(token)
+        self.assertEqual(after, before)
+        self.assertEqual(end_after, end)
+        self.assertEqual({change['id'] for change in after}, {product.id, other.id})
+
+    def test_invalid_since(self):
+        for since in ('abc', '-1', '99999999999999999999999', str(2 ** 63), '1.5', '²'):
+            response = self.client.get('/sync/changes/', {'since': since})
+            self.assertEqual(response.status_code, 400, since)
+        self.assertEqual(self.client.get('/sync/changes/', {'since': 2 ** 63 - 1}).status_code, 200)
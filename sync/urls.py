@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import list_changes
+
+urlpatterns = [
+    path('changes/', list_changes, name='sync-changes'),
+]
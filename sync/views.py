@@ -0,0 +1,53 @@
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework import status
+from django.conf import settings
+from config.pagination import PaginationError, parse_limit
+from .changes import changes_since
+from config.openapi import openapi, swagger_auto_schema
+
+@swagger_auto_schema(
+    methods=['GET'],
+    manual_parameters=[
+        openapi.Parameter(
+            'since',
+            openapi.IN_QUERY,
+            description="next_token from the previous response; 0 or omitted for a full sync",
+            type=openapi.TYPE_INTEGER,
+            required=False
+        ),
+        openapi.Parameter(
+            'limit',
+            openapi.IN_QUERY,
+            description="Maximum number of change-log entries to read",
+            type=openapi.TYPE_INTEGER,
+            required=False
+        )
+    ],
+    responses={
+        200: "Changed products, markets and rates (deleted ones as tombstones), next_token and has_more",
+        400: "Bad Request"
+    },
+    operation_description="Get the catalog rows created, updated or deleted since a change token"
+)
+@api_view(['GET'])
+def list_changes(request):
+    try:
+        since = int(request.query_params.get('since') or 0)
+    except ValueError:
+        since = -1
+    # change tokens are 64-bit row ids
+    if not 0 <= since < 2 ** 63:
+        return Response({"error": "since butun son bo'lishi kerak"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = parse_limit(
+            request.query_params.get('limit'), default=settings.SYNC_DEFAULT_LIMIT, maximum=settings.SYNC_MAX_LIMIT
+        )
+    except PaginationError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    changes, next_token, has_more = changes_since(since, limit)
+    return Response(
+        {"changes": changes, "next_token": next_token, "has_more": has_more},
+        status=status.HTTP_200_OK
+    )
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class UserConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'user'
+
+    def ready(self):
+        from config.cache import require_shared_cache
+        from . import signals
+        require_shared_cache('THROTTLE_CACHE_ALIAS', atomic=True)
+        require_shared_cache('OTP_CACHE_ALIAS')
+        require_shared_cache('AUTH_CACHE_ALIAS')
+        signals.connect()
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from config.cache import get_versions
+
+
+def user_version_name(user_id):
+    return f'user:{user_id}'
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that keeps the authenticated user in the
+    AUTH_CACHE_ALIAS cache for AUTH_USER_CACHE_TIMEOUT seconds, keyed by user id, the user's version
+    and the token's jti. Saving or deleting the user bumps the version (see
+    ``signals``), so changed users are loaded again on the next request.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        jti = validated_token.get(api_settings.JTI_CLAIM)
+        if user_id is None or jti is None:
+            return super().get_user(validated_token)
+        # read the version before the row, so a concurrent save can only make the cached copy unreachable
+        version, = get_versions([user_version_name(user_id)], using=settings.AUTH_CACHE_ALIAS)
+        key = f'auth:user:{user_id}:{version}:{jti}'
+        cache = caches[settings.AUTH_CACHE_ALIAS]
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
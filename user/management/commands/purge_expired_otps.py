@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from user.models import OTP
+from user.otp import expired_before
+
+
+class Command(BaseCommand):
+    help = "Delete expired OTPs in batches; run periodically (e.g. from cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.OTP_PURGE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        cutoff = expired_before()
+        total = 0
+        while True:
+            ids = list(
+                OTP.objects.filter(created_at__lt=cutoff).order_by('created_at')
+                .values_list('id', flat=True)[:options['batch_size']]
+            )
+            if not ids:
+                break
+            deleted, _ = OTP.objects.filter(id__in=ids).delete()
+            total += deleted
+        self.stdout.write(self.style.SUCCESS(f"Deleted {total} expired OTPs"))
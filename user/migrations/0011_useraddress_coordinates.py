@@ -0,0 +1,72 @@
+# Generated by Django 5.2 on 2026-10-18 18:14
+
+import json
+import re
+
+from django.db import migrations, models
+
+# Frozen copy of config.geo.parse_location as of this migration
+_PAIR_RE = re.compile(r'^\s*(-?\d+\.\d+)\s*,\s*(-?\d+\.\d+)\s*$')
+
+
+def _coordinates(lat, lng):
+    try:
+        lat, lng = float(lat), float(lng)
+    except (TypeError, ValueError):
+        return None, None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None, None
+    return lat, lng
+
+
+def parse_location(value):
+    if isinstance(value, str):
+        try:
+            decoded = json.loads(value)
+        except ValueError:
+            decoded = None
+        if isinstance(decoded, (dict, list)):
+            value = decoded
+        else:
+            match = _PAIR_RE.match(decoded if isinstance(decoded, str) else value)
+            return _coordinates(*match.groups()) if match else (None, None)
+    if isinstance(value, dict):
+        lat = next((value[key] for key in ('lat', 'latitude') if key in value), None)
+        lng = next((value[key] for key in ('lng', 'lon', 'long', 'longitude') if key in value), None)
+        return _coordinates(lat, lng)
+    if isinstance(value, (list, tuple)) and len(value) == 2:
+        return _coordinates(*value)
+    return None, None
+
+
+def fill_coordinates(apps, schema_editor):
+    UserAddress = apps.get_model('user', 'UserAddress')
+    batch = []
+    for address in UserAddress.objects.only('id', 'location').iterator(chunk_size=2000):
+        address.latitude, address.longitude = parse_location(address.location)
+        batch.append(address)
+        if len(batch) >= 2000:
+            UserAddress.objects.bulk_update(batch, ['latitude', 'longitude'])
+            batch = []
+    UserAddress.objects.bulk_update(batch, ['latitude', 'longitude'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0010_alter_otp_code'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='useraddress',
+            name='latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='useraddress',
+            name='longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_coordinates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 18:33
+
+import user.models
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0011_useraddress_coordinates'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='otp',
+            name='code',
+            field=models.PositiveIntegerField(default=user.models.otp_code),
+        ),
+        migrations.AlterField(
+            model_name='otp',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='otp',
+            name='key',
+            field=models.UUIDField(default=uuid.uuid4, unique=True),
+        ),
+    ]
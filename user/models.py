@@ -2,6 +2,7 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 from random import randint
 from uuid import uuid4
+from config.geo import parse_location
 
 
 class User(AbstractUser):
@@ -19,19 +20,32 @@ class UserAddress(models.Model):
     street = models.CharField(max_length=111)
     main = models.BooleanField(default=False)
     location = models.JSONField()
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.user.username
 
+    def save(self, *args, **kwargs):
+        self.latitude, self.longitude = parse_location(self.location)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'location' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'latitude', 'longitude'}
+        super().save(*args, **kwargs)
+
+
+def otp_code():
+    return randint(1000, 9999)
+
 
 class OTP(models.Model):
     user = models.ForeignKey("User",on_delete=models.CASCADE,related_name="otp_user")
-    key = models.UUIDField(default=uuid4)
-    code = models.PositiveIntegerField(default=randint(1000,10000))
+    key = models.UUIDField(default=uuid4, unique=True)
+    code = models.PositiveIntegerField(default=otp_code)
 
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
@@ -0,0 +1,73 @@
+import time
+import uuid
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+from .models import OTP
+
+OTPEntry = namedtuple('OTPEntry', ['id', 'user_id', 'code', 'created_at'])
+
+
+def otp_cache():
+    return caches[settings.OTP_CACHE_ALIAS]
+
+
+def _cache_key(key):
+    return f'otp:{key}'
+
+
+def expired_before():
+    """OTPs created before this moment have expired."""
+    return timezone.now() - timedelta(seconds=settings.OTP_TTL_SECONDS)
+
+
+def issue_otp(user, code):
+    """
+    Store a new OTP for ``user`` in the cache and in the table, replacing
+    any earlier ones so a user never has more than one row and a superseded
+    key stops verifying.
+    """
+    with transaction.atomic():
+        previous = OTP.objects.filter(user=user)
+        old_keys = list(previous.values_list('key', flat=True))
+        previous.delete()
+        otp = OTP.objects.create(user=user, code=code)
+    cache = otp_cache()
+    cache.delete_many([_cache_key(key) for key in old_keys])
+    entry = OTPEntry(otp.id, user.id, otp.code, otp.created_at.timestamp())
+    cache.set(_cache_key(otp.key), tuple(entry), timeout=settings.OTP_TTL_SECONDS)
+    return otp
+
+
+def find_otp(key):
+    """``OTPEntry`` for ``key`` from the cache, else by the unique index; None if unknown."""
+    try:
+        key = uuid.UUID(str(key))
+    except ValueError:
+        return None
+    cached = otp_cache().get(_cache_key(key))
+    if cached is not None:
+        return OTPEntry(*cached)
+    row = OTP.objects.filter(key=key).values_list('id', 'user_id', 'code', 'created_at').first()
+    if row is None:
+        return None
+    entry = OTPEntry(*row[:3], row[3].timestamp())
+    remaining = settings.OTP_TTL_SECONDS - (time.time() - entry.created_at)
+    if remaining > 0:
+        otp_cache().set(_cache_key(key), tuple(entry), timeout=remaining)
+    return entry
+
+
+def otp_expired(entry):
+    return time.time() - entry.created_at > settings.OTP_TTL_SECONDS
+
+
+def consume_otp(key, entry):
+    """Delete the OTP; False if another request already used or replaced it."""
+    deleted, _ = OTP.objects.filter(id=entry.id).delete()
+    otp_cache().delete(_cache_key(uuid.UUID(str(key))))
+    return deleted > 0
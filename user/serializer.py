@@ -33,7 +33,7 @@ class UserAddressSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = UserAddress
-        fields = ['id', 'user', 'street', 'location',  'main']
+        fields = ['id', 'user', 'street', 'location', 'latitude', 'longitude', 'main']
 
 class OTPSerializer(serializers.ModelSerializer):
     class Meta:
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from config.cache import invalidate
+from .authentication import user_version_name
+
+
+def invalidate_user(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate(user_version_name(instance.pk), using=settings.AUTH_CACHE_ALIAS)
+
+
+def connect():
+    User = get_user_model()
+    post_save.connect(invalidate_user, sender=User, dispatch_uid='user_invalidate_save')
+    post_delete.connect(invalidate_user, sender=User, dispatch_uid='user_invalidate_delete')
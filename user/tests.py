@@ -1,3 +1,159 @@
-from django.test import TestCase
+import threading
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.conf import settings
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+from config.cache import require_shared_cache
+from config.throttling import AuthIPThrottle
+from .models import OTP, User
+from .otp import find_otp, issue_otp
+
+
+def clear_caches():
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+
+class OTPTest(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create(username='buyer')
+        self.client = APIClient()
+
+    def verify(self, otp, code=None):
+        return self.client.post('/user/verify-otp/', {'key': str(otp.key), 'otp_code': code or otp.code})
+
+    def test_verify_once(self):
+        otp = issue_otp(self.user, 1234)
+        self.assertEqual(self.verify(otp, 4321).status_code, 400)
+        self.assertEqual(self.verify(otp).status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_verify)
+        self.assertEqual(self.verify(otp).status_code, 404)
+
+    def test_superseded_key_stops_verifying(self):
+        first = issue_otp(self.user, 1234)
+        second = issue_otp(self.user, 5678)
+        self.assertEqual(self.verify(first).status_code, 404)
+        self.assertEqual(OTP.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(self.verify(second).status_code, 200)
+
+    def test_copy_left_in_another_worker_cache_does_not_verify(self):
+        otp = issue_otp(self.user, 1234)
+        entry = find_otp(otp.key)
+        self.assertEqual(self.verify(otp).status_code, 200)
+        # a worker whose cache still holds the entry
+        caches[settings.OTP_CACHE_ALIAS].set(f'otp:{otp.key}', tuple(entry))
+        self.assertEqual(self.verify(otp).status_code, 404)
+
+    def test_expired(self):
+        otp = issue_otp(self.user, 1234)
+        with mock.patch('user.otp.time.time', return_value=otp.created_at.timestamp() + 61):
+            response = self.verify(otp)
+        self.assertEqual(response.status_code, 400)
+
+    def test_cached_key_of_deleted_user(self):
+        otp = issue_otp(self.user, 1234)
+        self.user.delete()
+        self.assertEqual(self.verify(otp).status_code, 404)
+
+    def test_key_found_after_cache_loss(self):
+        otp = issue_otp(self.user, 1234)
+        caches[settings.OTP_CACHE_ALIAS].clear()
+        self.assertEqual(self.verify(otp).status_code, 200)
+
+
+@override_settings(THROTTLE_RATES={'auth-ip': '3/m', 'auth-username': '100/m'})
+class ThrottleTest(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.client = APIClient()
+
+    def login(self, username='buyer', **headers):
+        return self.client.post('/user/login/', {'username': username, 'password': 'x'}, **headers)
+
+    def test_bucket_refills(self):
+        with mock.patch('config.throttling.time.time', return_value=1000.0):
+            for _ in range(3):
+                self.assertEqual(self.login().status_code, 401)
+            response = self.login()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '20')
+
+        with mock.patch('config.throttling.time.time', return_value=1020.0):
+            self.assertEqual(self.login().status_code, 401)
+            self.assertEqual(self.login().status_code, 429)
+
+    def test_forwarded_for_does_not_reset_the_bucket(self):
+        for i in range(3):
+            self.assertEqual(self.login(f'user{i}', HTTP_X_FORWARDED_FOR=f'10.0.0.{i}').status_code, 401)
+        self.assertEqual(self.login('user9', HTTP_X_FORWARDED_FOR='10.0.0.9').status_code, 429)
+
+    def test_parallel_burst_gets_capacity(self):
+        request = APIRequestFactory().post('/user/login/')
+        barrier = threading.Barrier(20)
+        allowed = []
+
+        def attempt():
+            barrier.wait()
+            allowed.append(AuthIPThrottle().allow_request(request, None))
+
+        threads = [threading.Thread(target=attempt) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(allowed.count(True), 3)
+
+    def test_process_local_cache_refused_outside_debug(self):
+        locmem = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+        database = {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache'}
+        redis = {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://cache:6379'}
+        with override_settings(DEBUG=True, CACHES={'shared': locmem}):
+            require_shared_cache('THROTTLE_CACHE_ALIAS', atomic=True)
+        for backend in (locmem, database):
+            with override_settings(DEBUG=False, CACHES={'shared': backend}):
+                with self.assertRaises(ImproperlyConfigured):
+                    require_shared_cache('THROTTLE_CACHE_ALIAS', atomic=True)
+        with override_settings(DEBUG=False, CACHES={'shared': redis}):
+            require_shared_cache('THROTTLE_CACHE_ALIAS', atomic=True)
+        with override_settings(DEBUG=False, CACHES={'shared': database}):
+            require_shared_cache('OTP_CACHE_ALIAS')
+
+
+class CachedAuthenticationTest(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.user = User.objects.create(username='buyer')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+
+    def test_user_is_read_once_per_token(self):
+        self.assertEqual(self.client.get('/user/me/').status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get('/user/me/')
+        self.assertEqual(response.json()['data']['username'], 'buyer')
+
+    def test_deactivated_user_is_rejected(self):
+        self.assertEqual(self.client.get('/user/me/').status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(self.client.get('/user/me/').status_code, 401)
+
+    def test_deleted_user_is_rejected(self):
+        self.assertEqual(self.client.get('/user/me/').status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertEqual(self.client.get('/user/me/').status_code, 401)
+
+    def test_saved_user_is_loaded_again(self):
+        self.client.get('/user/me/')
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.get(id=self.user.id).save()
+        with self.assertNumQueries(1):
+            self.client.get('/user/me/')
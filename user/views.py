@@ -1,9 +1,10 @@
 from django.contrib.auth import authenticate, login
 from django.shortcuts import get_object_or_404
 from rest_framework import permissions, status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, throttle_classes
 from rest_framework.response import Response
-from .models import UserAddress, OTP
+from .models import UserAddress
+from .otp import consume_otp, find_otp, issue_otp, otp_expired
 from django.contrib.auth import get_user_model
 from .serializer import UserSerializer, UserUpdateSerializer, UserAddressSerializer, OTPSerializer
 from random import randint
@@ -11,11 +12,9 @@ from django.views.decorators.csrf import csrf_exempt
 from random import randint
 from django.db.models import Q
 from django.views.decorators.csrf import csrf_exempt
-from drf_yasg.utils import swagger_auto_schema
-from django.utils import timezone
-from datetime import timedelta
+from config.openapi import openapi, swagger_auto_schema
+from config.throttling import AuthIPThrottle, OTPKeyThrottle, PhoneThrottle, UsernameThrottle
 from rest_framework_simplejwt.tokens import RefreshToken
-from drf_yasg import openapi
 
 
 User = get_user_model()
@@ -33,11 +32,13 @@ User = get_user_model()
                 }
             )
         ),
-        400: "Bad Request"
+        400: "Bad Request",
+        429: "Too many requests"
     },
     operation_description="Register a new user"
 )
 @api_view(['POST'])
+@throttle_classes([AuthIPThrottle, UsernameThrottle, PhoneThrottle])
 def signup(request):
     data = request.data
     serializer = UserSerializer(data=data)
@@ -46,7 +47,7 @@ def signup(request):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     user = serializer.save()
     otp_code_new = randint(1000, 9999)
-    otp = OTP.objects.create(user=user, code=otp_code_new)
+    otp = issue_otp(user, otp_code_new)
     user.set_password(password)
     user.save()
     print(f"Generated OTP Code: {otp_code_new}")
@@ -66,26 +67,32 @@ def signup(request):
             )
         ),
         400: "Bad Request",
-        404: "OTP not found"
+        404: "OTP not found",
+        429: "Too many requests"
     },
     operation_description="Verify OTP code"
 )
 @api_view(http_method_names=['POST'])
+@throttle_classes([AuthIPThrottle, OTPKeyThrottle])
 def verify_otp(request):
     data = request.data
     serializer = OTPSerializer(data=data)
     if not serializer.is_valid():
         return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
-    otp = OTP.objects.filter(key=data['key']).first()
+    otp = find_otp(data.get('key'))
     if not otp:
         return Response({"error": "OTP not found"}, status=status.HTTP_404_NOT_FOUND)
     if int(otp.code) != int(data['otp_code']):
         return Response({"error": "OTP invalid"}, status=status.HTTP_400_BAD_REQUEST)
-    if timezone.now() - otp.created_at > timedelta(seconds=60):
+    if otp_expired(otp):
         return Response(data={"error": "Your OTP has expired, please request a new one!"}, status=status.HTTP_400_BAD_REQUEST)
-    otp.user.is_verify = True
-    otp.user.save()
-    otp.delete()
+    user = User.objects.filter(id=otp.user_id).first()
+    if user is None:
+        return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
+    if not consume_otp(data['key'], otp):
+        return Response({"error": "OTP not found"}, status=status.HTTP_404_NOT_FOUND)
+    user.is_verify = True
+    user.save()
     return Response({"message": "OTP verified"}, status=status.HTTP_200_OK)
 
 @swagger_auto_schema(
@@ -143,11 +150,13 @@ def update_password(request):
             )
         ),
         401: "Invalid credentials",
-        403: "Account not verified"
+        403: "Account not verified",
+        429: "Too many requests"
     },
     operation_description="User login"
 )
 @api_view(http_method_names=['POST'])
+@throttle_classes([AuthIPThrottle, UsernameThrottle])
 def login(request):
     username = request.data.get('username')
     password = request.data.get('password')
@@ -200,11 +209,13 @@ def me(request):
         ),
         400: "Bad Request",
         401: "Unauthorized",
-        404: "User not found"
+        404: "User not found",
+        429: "Too many requests"
     },
     operation_description="Request password reset OTP"
 )
 @api_view(['POST'])
+@throttle_classes([AuthIPThrottle, PhoneThrottle])
 def reset_password(request):
     if not request.user.is_authenticated:
          return Response({"message": "Требуется авторизация"}, status=status.HTTP_401_UNAUTHORIZED)
@@ -212,11 +223,11 @@ def reset_password(request):
     if not phone:
         return Response({"message": "Phone shart"}, status=status.HTTP_400_BAD_REQUEST)
     try:
-        user = User.objects.get(phone=phone)
+        user = User.objects.get(phone_number=phone)
     except User.DoesNotExist:
         return Response({"message": "Invalid credentials"}, status=status.HTTP_404_NOT_FOUND)
     otp_code = randint(100000, 999999)
-    OTP.objects.create(user=user, code=otp_code)
+    issue_otp(user, otp_code)
     return Response({"message": "Parol reset uchun OTP yuborildi", "otp": otp_code}, status=status.HTTP_200_OK)
 
 @swagger_auto_schema(